@@ -3,21 +3,27 @@ from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocke
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, FileResponse
 from fastapi import Request
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, ConfigDict, HttpUrl
 from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from contextlib import asynccontextmanager
 import asyncio
-import json
+import orjson
 import os
 from datetime import datetime
 import logging
 import time
-from scraper_simple_deep import scrape_urls_simple_api, SimpleProductScraper
+import itertools
+import threading
+from collections import OrderedDict
+from scraper_simple_deep import scrape_urls_simple_api, SimpleProductScraper, SharedBrowser
 from scraper_ai_agent_deep import scrape_urls_ai_agent
-from image_url_fixer_deep import fix_product_images
+from image_url_fixer_deep import fix_product_images_batch, create_probe_client
 import glob
-import hashlib
+import gzip
+import xxhash
 from cachetools import TTLCache
 from datetime import timedelta
 import tenacity
@@ -26,8 +32,9 @@ from aiohttp import TCPConnector, ClientSession
 from urllib.parse import urlparse
 import re
 import concurrent.futures
+import multiprocessing
+from functools import lru_cache
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import httpx
 from selectolax.parser import HTMLParser
@@ -44,7 +51,86 @@ UPLOAD_LOGS_DIR = LOGS_BASE_DIR / "upload_logs"
 PRODUCT_UPLOAD_DIR = LOGS_BASE_DIR / "product_upload"
 PRODUCT_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI(title="AI-Powered Web Scraper API", version="2.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up shared clients and directories on startup and release them on shutdown"""
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # Create all log directories
+    LOGS_BASE_DIR.mkdir(parents=True, exist_ok=True)
+    AI_AGENT_LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    ENHANCED_LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    CRON_LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    UPLOAD_LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    PRODUCT_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)  
+    # Check if Gemini API key is available
+    api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
+    if not api_key:
+        logger.warning("GEMINI_API_KEY or GOOGLE_API_KEY environment variable not found. AI features will be disabled.")
+    else:
+        logger.info("Gemini API key found. AI features are enabled.")
+    
+    logger.info("🚀 AI-Powered Web Scraper API started successfully!")
+    logger.info("📊 Available scrapers: Simple Parser, AI Agent (Gemini 1.5 Flash)")
+    logger.info("🌐 GUI available at: http://localhost:8000/")
+    logger.info("📚 API docs available at: http://localhost:8000/docs")
+    logger.info("🔌 WebSocket support enabled for real-time updates")
+    logger.info("📁 Log directories created:")
+    logger.info(f"   - AI Agent logs: {AI_AGENT_LOGS_DIR}")
+    logger.info(f"   - Enhanced logs: {ENHANCED_LOGS_DIR}")
+    logger.info(f"   - Cron logs: {CRON_LOGS_DIR}")
+    logger.info(f"   - Upload logs: {UPLOAD_LOGS_DIR}")
+    logger.info(f"   - Product upload API data: {PRODUCT_UPLOAD_DIR}")
+    # Create upload_data directory if it doesn't exist
+    upload_dir = "upload_data"
+    os.makedirs(upload_dir, exist_ok=True)
+    logger.info(f"Ensured upload directory exists: {upload_dir}")
+    
+    # Create shared HTTP session (used for external API uploads)
+    app.state.http_session = ClientSession(
+        connector=TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300),
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+    # HTTP/2 client for image size probes during post-processing
+    app.state.image_client = create_probe_client()
+    # Shared keep-alive client for the scrapers (reuses TCP/TLS connections across URLs)
+    app.state.http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=30.0
+    )
+    # Client for /api/get-domain-urls crawls (lenient TLS, follows redirects,
+    # compressed HTML, HTTP/2 multiplexing where the site supports it)
+    app.state.crawl_client = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(15.0, connect=5.0),
+        verify=False,
+        follow_redirects=True,
+        headers={"User-Agent": "Mozilla/5.0", "Accept-Encoding": "gzip, br"},
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+    # One Chromium for every browser-based fetch (launched on first use, a context per page)
+    app.state.browser = SharedBrowser()
+    
+    yield
+    
+    # Close HTTP session
+    await app.state.http_session.close()
+    await app.state.image_client.aclose()
+    await app.state.http_client.aclose()
+    await app.state.crawl_client.aclose()
+    await app.state.browser.aclose()
+    # Release post-processing worker threads
+    _POST_PROCESS_POOL.shutdown(wait=False)
+    _SCRAPE_POOL.shutdown(wait=False, cancel_futures=True)
+    _HTML_PARSE_POOL.shutdown(wait=False)
+
+app = FastAPI(
+    title="AI-Powered Web Scraper API", version="2.0.0",
+    lifespan=lifespan, default_response_class=ORJSONResponse
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -65,15 +151,38 @@ templates = Jinja2Templates(directory="templates")
 
 # Configure cache
 url_cache = TTLCache(maxsize=1000, ttl=timedelta(hours=24).total_seconds())
-product_cache = TTLCache(maxsize=5000, ttl=timedelta(hours=12).total_seconds())
+# Post-processed product lists, bounded by the total size of their serialized blobs so
+# a few large scrapes can't pin hundreds of megabytes
+PRODUCT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+product_cache = TTLCache(
+    maxsize=PRODUCT_CACHE_MAX_BYTES,
+    ttl=timedelta(hours=1).total_seconds(),
+    getsizeof=lambda entry: len(entry["products"])
+)
+# TTLCache is not thread-safe and post-processing runs on worker threads
+_product_cache_lock = threading.Lock()
+
+# Shared worker pool for post-processing (hashing and serializing product lists)
+_POST_PROCESS_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="postproc")
+
+# Worker processes for CPU-bound HTML parsing, so scrapes don't hold the GIL the
+# event loop needs for status requests and WebSocket updates. Spawned (not forked)
+# because the server process already runs threads.
+_SCRAPE_POOL = concurrent.futures.ProcessPoolExecutor(
+    max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+)
 
 class ScrapeRequest(BaseModel):
     """Model for scrape request data"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     urls: List[HttpUrl]
     max_pages: int = 20
 
 class AIAgentScrapeRequest(BaseModel):
     """Model for AI agent scrape request data"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     urls: List[HttpUrl]
     max_pages_per_url: int = 50
     use_ai_pagination: bool = True
@@ -86,42 +195,127 @@ class ScrapeResponse(BaseModel):
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
-# Store active tasks and WebSocket connections
-active_tasks: Dict[str, Dict[str, Any]] = {}
+@dataclass(slots=True)
+class TaskState:
+    """In-memory state of a scraping task, updated on every progress tick"""
+    task_id: str
+    status: str
+    scraper_type: str
+    start_time: str
+    urls: List[str]
+    current_progress: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    end_time: Optional[str] = None
+    processing_time: Optional[float] = None
+    # Scraper-specific fields (max_pages, features, ai_stats, termination_reason, ...)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat dict served by /status and the WebSocket updates"""
+        data = {name: getattr(self, name) for name in self.__slots__ if name != "extra"}
+        data.update(self.extra)
+        return data
+
+# Store active tasks and WebSocket connections. Kept in insertion/access order so the
+# oldest finished tasks can be dropped; running tasks are never evicted.
+active_tasks: OrderedDict[str, TaskState] = OrderedDict()
+MAX_STORED_TASKS = 256
+TERMINAL_TASK_STATUSES = ("completed", "failed", "terminated")
+
+def _evict_if_needed(max_tasks: int = MAX_STORED_TASKS) -> None:
+    """Pop the oldest completed/failed/terminated tasks until at most max_tasks remain"""
+    excess = len(active_tasks) - max_tasks
+    if excess <= 0:
+        return
+    finished = [task_id for task_id, task in active_tasks.items() if task.status in TERMINAL_TASK_STATUSES]
+    for task_id in finished[:excess]:
+        del active_tasks[task_id]
+
+# Monotonic sequence so task IDs minted in the same nanosecond stay unique
+_TASK_SEQ = itertools.count()
+
+def new_task_id() -> str:
+    """Mint a unique task ID from the wall clock and a process-wide counter"""
+    return f"{time.time_ns():x}_{next(_TASK_SEQ):x}"
 
 class ConnectionManager:
+    # Minimum spacing between progress frames sent for one task
+    PROGRESS_MIN_INTERVAL = 0.1
+
     def __init__(self):
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        # Running total so /health doesn't walk every task's connection list
+        self.connection_count = 0
+        # Newest not-yet-sent progress frame and its flusher task, per task
+        self._pending_progress: Dict[str, dict] = {}
+        self._progress_flushers: Dict[str, asyncio.Task] = {}
 
     async def connect(self, websocket: WebSocket, task_id: str):
         await websocket.accept()
         if task_id not in self.active_connections:
             self.active_connections[task_id] = []
         self.active_connections[task_id].append(websocket)
+        self.connection_count += 1
         logger.info(f"WebSocket connection established for task {task_id}")
 
     def disconnect(self, websocket: WebSocket, task_id: str):
         if task_id in self.active_connections:
-            self.active_connections[task_id].remove(websocket)
+            if websocket in self.active_connections[task_id]:
+                self.active_connections[task_id].remove(websocket)
+                self.connection_count -= 1
             if not self.active_connections[task_id]:
                 del self.active_connections[task_id]
         logger.info(f"WebSocket connection closed for task {task_id}")
 
+    def queue_progress_update(self, task_id: str, message: dict):
+        """
+        Queue a progress frame, coalescing bursts.
+        
+        Only the newest frame is kept; a per-task flusher sends it and then
+        waits PROGRESS_MIN_INTERVAL, so intermediate frames are dropped.
+        """
+        if not self.active_connections.get(task_id):
+            return
+        self._pending_progress[task_id] = message
+        if task_id not in self._progress_flushers:
+            self._progress_flushers[task_id] = asyncio.create_task(self._flush_progress(task_id))
+
+    async def _flush_progress(self, task_id: str):
+        try:
+            while task_id in self._pending_progress:
+                await self.send_progress_update(task_id, self._pending_progress.pop(task_id))
+                await asyncio.sleep(self.PROGRESS_MIN_INTERVAL)
+        finally:
+            # A cancelled flusher may finish after a new one was registered; leave that one alone
+            if self._progress_flushers.get(task_id) is asyncio.current_task():
+                del self._progress_flushers[task_id]
+
+    def _drop_pending_progress(self, task_id: str):
+        self._pending_progress.pop(task_id, None)
+        flusher = self._progress_flushers.pop(task_id, None)
+        if flusher and flusher is not asyncio.current_task():
+            flusher.cancel()
+
     async def send_progress_update(self, task_id: str, message: dict):
+        if message.get("type") != "progress_update":
+            # Completion/failure/termination supersede any progress frame still queued
+            self._drop_pending_progress(task_id)
         if task_id in self.active_connections and self.active_connections[task_id]:
-            logger.info(f"Sending WebSocket message to {len(self.active_connections[task_id])} connections for task {task_id}: {message}")
-            disconnected_connections = []
-            for connection in self.active_connections[task_id]:
-                try:
-                    await connection.send_json(message)
-                    logger.debug(f"Successfully sent message to WebSocket connection")
-                except Exception as e:
-                    logger.error(f"Failed to send WebSocket message: {e}")
-                    disconnected_connections.append(connection)
+            connections = list(self.active_connections[task_id])
+            logger.info(f"Sending WebSocket message to {len(connections)} connections for task {task_id}: {message}")
+            # Encode once and send to all subscribers concurrently
+            payload = orjson.dumps(message).decode()
+            results = await asyncio.gather(
+                *(connection.send_text(payload) for connection in connections),
+                return_exceptions=True
+            )
             
             # Clean up disconnected connections
-            for connection in disconnected_connections:
-                self.disconnect(connection, task_id)
+            for connection, outcome in zip(connections, results):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Failed to send WebSocket message: {outcome}")
+                    self.disconnect(connection, task_id)
         else:
             # This is normal - client may have disconnected or not established connection yet
             logger.debug(f"No active WebSocket connections for task {task_id} - continuing task in background")
@@ -130,7 +324,7 @@ class ConnectionManager:
         """Close all WebSocket connections for a specific task"""
         if task_id in self.active_connections:
             disconnected_connections = []
-            for connection in self.active_connections[task_id]:
+            for connection in list(self.active_connections[task_id]):
                 try:
                     await connection.close()
                     disconnected_connections.append(connection)
@@ -138,7 +332,7 @@ class ConnectionManager:
                     logger.error(f"Error closing WebSocket connection: {e}")
             
             # Clean up the connections
-            del self.active_connections[task_id]
+            self.connection_count -= len(self.active_connections.pop(task_id, []))
             logger.info(f"🔌 Closed {len(disconnected_connections)} WebSocket connections for task {task_id}")
         else:
             logger.info(f"ℹ️ No active WebSocket connections found for task {task_id}")
@@ -156,9 +350,15 @@ def retry_with_exponential_backoff():
     )
 
 # Caching functions
+@lru_cache(maxsize=8192)
 def get_url_hash(url):
     """Generate hash for URL caching"""
-    return hashlib.md5(url.encode()).hexdigest()
+    return xxhash.xxh3_64_hexdigest(url.encode())
+
+@lru_cache(maxsize=8192)
+def _netloc(url):
+    """Host part of a URL, memoized since the same URLs are parsed repeatedly"""
+    return urlparse(url).netloc
 
 async def get_cached_or_scrape(url, scraper, is_collection=False, max_pages=20):
     """Get data from cache or scrape if not available"""
@@ -180,9 +380,56 @@ async def get_cached_or_scrape(url, scraper, is_collection=False, max_pages=20):
     url_cache[url_hash] = data
     return data
 
-def post_process_scraped_data_sync(result):
+async def fix_result_images(products, client):
+    """
+    Fix image URLs and sizes for every product in place
+    
+    Args:
+        products (list): Scraped products
+        client (httpx.AsyncClient): Client used for the size probes
+        
+    Returns:
+        dict: Image-fix summary counters
+    """
+    fixed_count = 0
+    total_images_before = 0
+    total_images_after = 0
+    
+    # Fix every product's images in a single batch
+    with_images = [product for product in products if 'product_images' in product]
+    batch_results = await fix_product_images_batch(client, [product['product_images'] for product in with_images])
+    
+    for product, (fixed, sizes) in zip(with_images, batch_results):
+        original_count = len(product['product_images'])
+        total_images_before += original_count
+        
+        product['product_images'] = fixed
+        product['image_sizes'] = sizes
+        new_count = len(product['product_images'])
+        total_images_after += new_count
+        
+        if original_count != new_count:
+            fixed_count += 1
+            product_name = product.get('product_name', 'Unknown')[:40]
+            logger.info(f"🔧 Fixed '{product_name}': {original_count} -> {new_count} images")
+    
+    return {
+        "total_products": len(products),
+        "fixed_count": fixed_count,
+        "total_images_before": total_images_before,
+        "total_images_after": total_images_after
+    }
+
+def _products_digest(products):
+    """xxh3 digest of a product list, or None if it can't be serialized"""
+    try:
+        return xxhash.xxh3_64_hexdigest(orjson.dumps(products))
+    except TypeError:
+        return None
+
+async def post_process_scraped_data(result):
     """
-    Synchronous post-processing of scraped data to fix image URLs
+    Post-processing of scraped data to fix image URLs
     
     Args:
         result (dict): Raw scraped data
@@ -196,28 +443,36 @@ def post_process_scraped_data_sync(result):
         logger.warning("⚠️ No products found in result, skipping post-processing")
         return result
     
-    total_products = len(result['products'])
-    fixed_count = 0
-    total_images_before = 0
-    total_images_after = 0
+    loop = asyncio.get_running_loop()
+    
+    # Identical product lists (e.g. re-served from url_cache) reuse the earlier fix
+    products_digest = await loop.run_in_executor(_POST_PROCESS_POOL, _products_digest, result['products'])
+    
+    with _product_cache_lock:
+        cached = product_cache.get(products_digest) if products_digest else None
+    
+    if cached is not None:
+        logger.info("♻️ Reusing cached post-processing result for identical products")
+        result['products'] = await loop.run_in_executor(_POST_PROCESS_POOL, orjson.loads, cached['products'])
+        summary = cached['summary']
+    else:
+        # Size probes are pure I/O, so they run as coroutines on the shared image client
+        summary = await fix_result_images(result['products'], app.state.image_client)
+        if products_digest:
+            products_blob = await loop.run_in_executor(_POST_PROCESS_POOL, orjson.dumps, result['products'])
+            # One huge list would evict everything else (or be rejected outright by TTLCache)
+            if len(products_blob) <= PRODUCT_CACHE_MAX_BYTES // 4:
+                with _product_cache_lock:
+                    product_cache[products_digest] = {
+                        "summary": summary,
+                        "products": products_blob
+                    }
+    
+    total_products = summary['total_products']
+    fixed_count = summary['fixed_count']
+    total_images_before = summary['total_images_before']
+    total_images_after = summary['total_images_after']
     
-    for product in result['products']:
-        if 'product_images' in product:
-            original_count = len(product['product_images'])
-            total_images_before += original_count
-            
-            # Fix the product images
-            fixed, sizes = fix_product_images(product['product_images'])
-            product['product_images'] = fixed
-            product['image_sizes'] = sizes
-            new_count = len(product['product_images'])
-            total_images_after += new_count
-            
-            if original_count != new_count:
-                fixed_count += 1
-                product_name = product.get('product_name', 'Unknown')[:40]
-                logger.info(f"🔧 Fixed '{product_name}': {original_count} -> {new_count} images")
-
     # Calculate statistics
     images_removed = total_images_before - total_images_after
     fix_percentage = (fixed_count / total_products * 100) if total_products > 0 else 0
@@ -239,12 +494,6 @@ def post_process_scraped_data_sync(result):
     
     return result
 
-async def post_process_scraped_data(result):
-    """Async wrapper for post-processing"""
-    loop = asyncio.get_event_loop()
-    with concurrent.futures.ThreadPoolExecutor() as pool:
-        return await loop.run_in_executor(pool, post_process_scraped_data_sync, result)
-
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """Serve the main GUI interface"""
@@ -262,14 +511,14 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
     try:
         # Send current task status if available
         if task_id in active_tasks:
-            await websocket.send_json({
+            await websocket.send_text(orjson.dumps({
                 "type": "status_update",
-                "data": active_tasks[task_id]
-            })
+                "data": active_tasks[task_id].to_dict()
+            }).decode())
         
         while True:
-            # Keep connection alive
-            await asyncio.sleep(1)
+            # Park until the client sends something or disconnects (raises WebSocketDisconnect)
+            await websocket.receive_text()
             
     except WebSocketDisconnect:
         manager.disconnect(websocket, task_id)
@@ -341,7 +590,8 @@ async def debug_test_url(url_request: dict):
             raise HTTPException(status_code=400, detail="URL is required")
         
         # Initialize scraper for testing
-        scraper = SimpleProductScraper()
+        scraper = SimpleProductScraper(http_client=app.state.http_client, parse_pool=_SCRAPE_POOL,
+                                       browser=app.state.browser)
         
         # Test URL classification
         is_collection = scraper.is_collection_url(url)
@@ -407,7 +657,7 @@ async def health_check():
     return {
         "status": "healthy",
         "active_tasks": len(active_tasks),
-        "active_websockets": sum(len(connections) for connections in manager.active_connections.values()),
+        "active_websockets": manager.connection_count,
         "scraper_types": ["simple", "ai_agent"],
         "timestamp": datetime.now().isoformat()
     }
@@ -443,42 +693,42 @@ async def scrape_products(request: ScrapeRequest, background_tasks: BackgroundTa
     - Automatic retry logic with exponential backoff
     - Real-time progress updates via WebSocket
     """
-    task_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+    task_id = new_task_id()
     
-    logger.info(f"🚀 Starting ENHANCED UNIVERSAL scrape task {task_id} with {len(request.urls)} URLs")
+    urls_str = [str(url) for url in request.urls]
+    
+    logger.info(f"🚀 Starting ENHANCED UNIVERSAL scrape task {task_id} with {len(urls_str)} URLs")
     
     # Store enhanced task info
-    active_tasks[task_id] = {
-        "task_id": task_id,
-        "status": "started",
-        "scraper_type": "enhanced-universal",
-        "start_time": datetime.now().isoformat(),
-        "urls": [str(url) for url in request.urls],
-        "max_pages": request.max_pages,
-        "result": None,
-        "error": None,
-        "end_time": None,
-        "processing_time": None,
-        "features": [
-            "Universal compatibility",
-            "Multiple extraction methods", 
-            "Intelligent fallbacks",
-            "Enhanced pagination",
-            "Smart URL detection",
-            "Data validation",
-            "Parallel processing",
-            "Real-time updates"
-        ],
-        "current_progress": {
+    active_tasks[task_id] = TaskState(
+        task_id=task_id,
+        status="started",
+        scraper_type="enhanced-universal",
+        start_time=datetime.now().isoformat(),
+        urls=urls_str,
+        current_progress={
             "stage": "initializing",
             "percentage": 0,
             "details": "🔧 Initializing enhanced universal scraper...",
             "timestamp": datetime.now().isoformat()
+        },
+        extra={
+            "max_pages": request.max_pages,
+            "features": [
+                "Universal compatibility",
+                "Multiple extraction methods", 
+                "Intelligent fallbacks",
+                "Enhanced pagination",
+                "Smart URL detection",
+                "Data validation",
+                "Parallel processing",
+                "Real-time updates"
+            ]
         }
-    }
+    )
     
     # Start enhanced scraping in background
-    background_tasks.add_task(run_simple_scrape_task, task_id, [str(url) for url in request.urls], request.max_pages)
+    background_tasks.add_task(run_simple_scrape_task, task_id, urls_str, request.max_pages)
     
     return ScrapeResponse(
         success=True,
@@ -522,35 +772,35 @@ async def scrape_products_ai(request: AIAgentScrapeRequest, background_tasks: Ba
     - **use_ai_pagination**: Enable AI-powered pagination discovery (default: true)
     - **ai_extraction_mode**: Use AI for product data extraction (default: true)
     """
-    task_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Include milliseconds
+    task_id = new_task_id()
     
-    logger.info(f"Starting AI agent scrape task {task_id} with {len(request.urls)} URLs")
+    urls_str = [str(url) for url in request.urls]
+    
+    logger.info(f"Starting AI agent scrape task {task_id} with {len(urls_str)} URLs")
     
     # Store task info
-    active_tasks[task_id] = {
-        "task_id": task_id,
-        "status": "started",
-        "scraper_type": "ai_agent",
-        "start_time": datetime.now().isoformat(),
-        "urls": [str(url) for url in request.urls],
-        "max_pages_per_url": request.max_pages_per_url,
-        "use_ai_pagination": request.use_ai_pagination,
-        "ai_extraction_mode": request.ai_extraction_mode,
-        "result": None,
-        "error": None,
-        "end_time": None,
-        "processing_time": None,
-        "ai_stats": None,
-        "current_progress": {
+    active_tasks[task_id] = TaskState(
+        task_id=task_id,
+        status="started",
+        scraper_type="ai_agent",
+        start_time=datetime.now().isoformat(),
+        urls=urls_str,
+        current_progress={
             "stage": "initializing",
             "percentage": 0,
             "details": "🧠 AI agent initializing...",
             "timestamp": datetime.now().isoformat()
+        },
+        extra={
+            "max_pages_per_url": request.max_pages_per_url,
+            "use_ai_pagination": request.use_ai_pagination,
+            "ai_extraction_mode": request.ai_extraction_mode,
+            "ai_stats": None
         }
-    }
+    )
     
     # Start AI scraping in background
-    background_tasks.add_task(run_ai_scrape_task, task_id, [str(url) for url in request.urls], request.max_pages_per_url)
+    background_tasks.add_task(run_ai_scrape_task, task_id, urls_str, request.max_pages_per_url)
     
     return ScrapeResponse(
         success=True,
@@ -577,98 +827,145 @@ async def get_task_status(task_id: str):
     if task_id not in active_tasks:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return active_tasks[task_id]
-
-@app.get("/api/tasks")
-async def list_available_tasks():
-    """List all available scraping tasks, searching in all log directories"""
-    try:
-        # Search all log directories
-        log_directories = [AI_AGENT_LOGS_DIR, ENHANCED_LOGS_DIR, CRON_LOGS_DIR, UPLOAD_LOGS_DIR, LOGS_BASE_DIR]
-        
-        # Get all JSON files from all directories
-        json_files = []
-        for log_dir in log_directories:
-            if log_dir.exists():
-                json_files.extend(log_dir.glob("*.json"))
+    return active_tasks[task_id].to_dict()
+
+def open_log_file(file_path):
+    """Open a JSON log for binary reading; *.json.gz (cron) logs are decompressed"""
+    if str(file_path).endswith('.gz'):
+        return gzip.open(file_path, 'rb')
+    return open(file_path, 'rb')
+
+def read_json_file(file_path) -> Any:
+    """Load a JSON file with orjson (blocking; run via asyncio.to_thread from handlers)"""
+    with open_log_file(file_path) as f:
+        return orjson.loads(f.read())
+
+def write_json_file(file_path, data) -> None:
+    """Write data as indented JSON with orjson (blocking; run via asyncio.to_thread from handlers)"""
+    with open(file_path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+# Per-file summaries for /api/tasks, keyed by path and invalidated when the file's mtime changes
+_TASK_FILE_INDEX: Dict[str, tuple] = {}
+
+def get_task_file_summary(file_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Return metadata and product count for a log file, re-parsing only when it changed"""
+    cached = _TASK_FILE_INDEX.get(file_path)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    
+    data = read_json_file(file_path)
+    
+    summary = {
+        'metadata': data.get('metadata', {}),
+        'products_count': len(data.get('products', []))
+    }
+    _TASK_FILE_INDEX[file_path] = (mtime_ns, summary)
+    return summary
+
+def collect_task_summaries(log_directories):
+    """Scan the log directories and group their JSON files by task (blocking)"""
+    # Get all JSON files (with their mtimes) from all directories
+    json_files = []
+    for log_dir in log_directories:
+        if log_dir.exists():
+            with os.scandir(log_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(('.json', '.json.gz')) and entry.is_file():
+                        json_files.append((pathlib.Path(entry.path), entry.stat().st_mtime_ns))
+    
+    # Drop cached summaries for files that no longer exist
+    live_paths = {str(file_path) for file_path, _ in json_files}
+    for stale_path in _TASK_FILE_INDEX.keys() - live_paths:
+        _TASK_FILE_INDEX.pop(stale_path, None)
+    
+    # Group files by task ID
+    tasks = {}
+    
+    for file_path, mtime_ns in json_files:
+        filename = file_path.name
+        stem = filename.rsplit('.json', 1)[0]
+        
+        # Extract task ID and type from filename
+        if filename.startswith('ai_agent_scrape_'):
+            task_type = 'ai_agent'
+            task_part = stem.replace('ai_agent_scrape_', '')
+        elif filename.startswith('enhanced_scrape_'):
+            task_type = 'enhanced-universal'
+            task_part = stem.replace('enhanced_scrape_', '')
+        elif filename.startswith('cron_scrape_'):
+            task_type = 'cron'
+            task_part = stem.replace('cron_scrape_', '')
+        elif filename.startswith('uploadjson_'):
+            task_type = 'upload'
+            task_part = stem.replace('uploadjson_', '')
+        else:
+            task_type = 'unknown'
+            task_part = stem
         
-        # Group files by task ID
-        tasks = {}
+        # Check if it's a FIXED version
+        is_fixed = task_part.endswith('_FIXED')
+        if is_fixed:
+            task_id = task_part.replace('_FIXED', '')
+        else:
+            task_id = task_part
         
-        for file_path in json_files:
-            filename = file_path.name
+        # Read file metadata (cached until the file changes)
+        try:
+            summary = get_task_file_summary(str(file_path), mtime_ns)
+            metadata = summary['metadata']
+            products_count = summary['products_count']
             
-            # Extract task ID and type from filename
-            if filename.startswith('ai_agent_scrape_'):
-                task_type = 'ai_agent'
-                task_part = filename.replace('ai_agent_scrape_', '').replace('.json', '')
-            elif filename.startswith('enhanced_scrape_'):
-                task_type = 'enhanced-universal'
-                task_part = filename.replace('enhanced_scrape_', '').replace('.json', '')
-            elif filename.startswith('cron_scrape_'):
-                task_type = 'cron'
-                task_part = filename.replace('cron_scrape_', '').replace('.json', '')
-            elif filename.startswith('uploadjson_'):
-                task_type = 'upload'
-                task_part = filename.replace('uploadjson_', '').replace('.json', '')
-            else:
-                task_type = 'unknown'
-                task_part = filename.replace('.json', '')
+            if task_id not in tasks:
+                tasks[task_id] = {
+                    'task_id': task_id,
+                    'task_type': task_type,
+                    'has_original': False,
+                    'has_fixed': False,
+                    'original_file': None,
+                    'fixed_file': None,
+                    'products_count': 0,
+                    'timestamp': metadata.get('timestamp', ''),
+                    'scraper_type': metadata.get('scraper_type', task_type),
+                    'ai_stats': metadata.get('ai_stats', {}),
+                    'urls_processed': metadata.get('urls_processed', 0),
+                    'log_directory': str(file_path.parent)
+                }
             
-            # Check if it's a FIXED version
-            is_fixed = task_part.endswith('_FIXED')
             if is_fixed:
-                task_id = task_part.replace('_FIXED', '')
+                tasks[task_id]['has_fixed'] = True
+                tasks[task_id]['fixed_file'] = filename
             else:
-                task_id = task_part
+                tasks[task_id]['has_original'] = True
+                tasks[task_id]['original_file'] = filename
             
-            # Read file metadata
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                metadata = data.get('metadata', {})
-                products_count = len(data.get('products', []))
+            # Use the count from the FIXED version if available, otherwise original
+            if is_fixed or not tasks[task_id]['has_fixed']:
+                tasks[task_id]['products_count'] = products_count
                 
-                if task_id not in tasks:
-                    tasks[task_id] = {
-                        'task_id': task_id,
-                        'task_type': task_type,
-                        'has_original': False,
-                        'has_fixed': False,
-                        'original_file': None,
-                        'fixed_file': None,
-                        'products_count': 0,
-                        'timestamp': metadata.get('timestamp', ''),
-                        'scraper_type': metadata.get('scraper_type', task_type),
-                        'ai_stats': metadata.get('ai_stats', {}),
-                        'urls_processed': metadata.get('urls_processed', 0),
-                        'log_directory': str(file_path.parent)
-                    }
-                
-                if is_fixed:
-                    tasks[task_id]['has_fixed'] = True
-                    tasks[task_id]['fixed_file'] = filename
-                else:
-                    tasks[task_id]['has_original'] = True
-                    tasks[task_id]['original_file'] = filename
-                
-                # Use the count from the FIXED version if available, otherwise original
-                if is_fixed or not tasks[task_id]['has_fixed']:
-                    tasks[task_id]['products_count'] = products_count
-                    
-            except Exception as e:
-                logger.warning(f"Error reading file {filename}: {e}")
-                continue
-        
-        # Convert to list and sort by timestamp (newest first)
-        tasks_list = list(tasks.values())
-        tasks_list.sort(key=lambda x: x['timestamp'], reverse=True)
+        except Exception as e:
+            logger.warning(f"Error reading file {filename}: {e}")
+            continue
+    
+    # Convert to list and sort by timestamp (newest first)
+    tasks_list = list(tasks.values())
+    tasks_list.sort(key=lambda x: x['timestamp'], reverse=True)
+    
+    # Add preferred file information
+    for task in tasks_list:
+        task['preferred_file'] = task['fixed_file'] if task['has_fixed'] else task['original_file']
+        task['preferred_version'] = 'FIXED' if task['has_fixed'] else 'ORIGINAL'
+    
+    return tasks_list
+
+@app.get("/api/tasks")
+async def list_available_tasks():
+    """List all available scraping tasks, searching in all log directories"""
+    try:
+        # Search all log directories
+        log_directories = [AI_AGENT_LOGS_DIR, ENHANCED_LOGS_DIR, CRON_LOGS_DIR, UPLOAD_LOGS_DIR, LOGS_BASE_DIR]
         
-        # Add preferred file information
-        for task in tasks_list:
-            task['preferred_file'] = task['fixed_file'] if task['has_fixed'] else task['original_file']
-            task['preferred_version'] = 'FIXED' if task['has_fixed'] else 'ORIGINAL'
+        tasks_list = await asyncio.to_thread(collect_task_summaries, log_directories)
         
         return {
             "success": True,
@@ -681,61 +978,52 @@ async def list_available_tasks():
         logger.error(f"Error listing tasks: {e}")
         raise HTTPException(status_code=500, detail=f"Error listing tasks: {str(e)}")
 
+TASK_FILE_PREFIXES = ("ai_agent_scrape_", "enhanced_scrape_", "cron_scrape_", "uploadjson_")
+
+def find_task_file(task_id: str, log_directories: List[pathlib.Path]):
+    """
+    Locate the log file for a task, preferring the FIXED version.
+    
+    Known filenames are probed directly; the directory is only globbed
+    when none of them exist.
+    
+    Returns:
+        tuple: (path or None, is_fixed_version)
+    """
+    existing_dirs = [log_dir for log_dir in log_directories if log_dir.exists()]
+    
+    for suffix, is_fixed in (("_FIXED.json", True), (".json", False), (".json.gz", False)):
+        for log_dir in existing_dirs:
+            for prefix in TASK_FILE_PREFIXES:
+                candidate = log_dir / f"{prefix}{task_id}{suffix}"
+                if candidate.is_file():
+                    return candidate, is_fixed
+        
+        # Fall back to a wildcard match only when no known name exists
+        for log_dir in existing_dirs:
+            matching_files = list(log_dir.glob(f"*{task_id}*{suffix}"))
+            if matching_files:
+                return matching_files[0], is_fixed
+    
+    return None, False
+
 @app.get("/api/products/{task_id}")
-async def get_products_by_task_id(task_id: str):
-    """Get products from a specific task, searching in all log directories"""
+async def get_products_by_task_id(task_id: str, raw: bool = False):
+    """
+    Get products from a specific task, searching in all log directories
+    
+    With ``raw=true`` the stored log file is streamed as-is and the lookup
+    details are returned in ``X-Loaded-*`` headers instead of the body.
+    """
     try:
         # Search all log directories
         log_directories = [AI_AGENT_LOGS_DIR, ENHANCED_LOGS_DIR, CRON_LOGS_DIR, UPLOAD_LOGS_DIR, LOGS_BASE_DIR]
         
-        found_file = None
-        is_fixed_version = False
-        
-        # Look for FIXED version first in all directories
-        for log_dir in log_directories:
-            if not log_dir.exists():
-                continue
-                
-            fixed_patterns = [
-                f"ai_agent_scrape_{task_id}_FIXED.json",
-                f"enhanced_scrape_{task_id}_FIXED.json", 
-                f"cron_scrape_{task_id}_FIXED.json",
-                f"uploadjson_{task_id}_FIXED.json",
-                f"*{task_id}*_FIXED.json"
-            ]
-            
-            for pattern in fixed_patterns:
-                matching_files = list(log_dir.glob(pattern))
-                if matching_files:
-                    found_file = matching_files[0]
-                    is_fixed_version = True
-                    logger.info(f"🔧 Found FIXED version: {found_file}")
-                    break
-            if found_file:
-                break
-        
-        # If no FIXED version found, look for original in all directories
-        if not found_file:
-            for log_dir in log_directories:
-                if not log_dir.exists():
-                    continue
-                    
-                original_patterns = [
-                    f"ai_agent_scrape_{task_id}.json",
-                    f"enhanced_scrape_{task_id}.json",
-                    f"cron_scrape_{task_id}.json", 
-                    f"uploadjson_{task_id}.json",
-                    f"*{task_id}*.json"
-                ]
-                
-                for pattern in original_patterns:
-                    matching_files = list(log_dir.glob(pattern))
-                    if matching_files:
-                        found_file = matching_files[0]
-                        logger.info(f"📄 Found original version: {found_file}")
-                        break
-                if found_file:
-                    break
+        found_file, is_fixed_version = await asyncio.to_thread(find_task_file, task_id, log_directories)
+        if found_file and is_fixed_version:
+            logger.info(f"🔧 Found FIXED version: {found_file}")
+        elif found_file:
+            logger.info(f"📄 Found original version: {found_file}")
         
         if not found_file:
             # List available files for debugging
@@ -743,6 +1031,7 @@ async def get_products_by_task_id(task_id: str):
             for log_dir in log_directories:
                 if log_dir.exists():
                     available_files.extend(log_dir.glob("*.json"))
+                    available_files.extend(log_dir.glob("*.json.gz"))
             
             logger.warning(f"No file found for task_id: {task_id}")
             logger.info(f"Available files: {[f.name for f in available_files]}")
@@ -752,9 +1041,19 @@ async def get_products_by_task_id(task_id: str):
                 detail=f"No scraping results found for task ID: {task_id}"
             )
         
+        if raw:
+            headers = {
+                "X-Loaded-From-Fixed": str(is_fixed_version).lower(),
+                "X-Loaded-File": found_file.name,
+                "X-Log-Directory": str(found_file.parent)
+            }
+            # Compressed logs are sent as-is for the client to decode
+            if found_file.name.endswith('.gz'):
+                headers["Content-Encoding"] = "gzip"
+            return FileResponse(found_file, media_type="application/json", headers=headers)
+        
         # Load and return the file
-        with open(found_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = await asyncio.to_thread(read_json_file, found_file)
         
         products = data.get('products', [])
         metadata = data.get('metadata', {})
@@ -789,9 +1088,11 @@ async def get_products_by_task_id(task_id: str):
             "message": f"Loaded {len(products)} products from {'FIXED' if is_fixed_version else 'original'} version"
         }
         
+    except HTTPException:
+        raise
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"No scraping results found for task ID: {task_id}")
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=500, detail=f"Invalid JSON data for task ID: {task_id}")
     except Exception as e:
         logger.error(f"Error retrieving products for task {task_id}: {e}")
@@ -822,7 +1123,7 @@ async def upload_products(request: UploadProductsRequest):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Save the exact API format before posting
-        api_file = save_product_upload_api_data(transformed_data, timestamp)
+        api_file = await asyncio.to_thread(save_product_upload_api_data, transformed_data, timestamp)
         
         # Prepare the upload data for our records
         upload_data = {
@@ -847,8 +1148,7 @@ async def upload_products(request: UploadProductsRequest):
         filename = f"uploadjson_{timestamp}.json"
         upload_file = upload_dir / filename
         
-        with open(upload_file, 'w', encoding='utf-8') as f:
-            json.dump(upload_data, f, indent=2, ensure_ascii=False)
+        await asyncio.to_thread(write_json_file, upload_file, upload_data)
         
         logger.info(f"✅ Successfully saved {len(products)} products to {upload_file}")
         
@@ -875,15 +1175,41 @@ async def upload_products(request: UploadProductsRequest):
     except Exception as e:
         logger.error(f"❌ Error uploading products: {e}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+# Field layout of a product in the external API payload. Constant values are
+# filled in here; per-product fields (None) are overwritten for every product.
+EXTERNAL_PRODUCT_TEMPLATE = {
+    "product_name": None,
+    "category_name": None,
+    "description": None,
+    "status": "1",
+    "product_image": None,
+    "product_video": None,
+    "product_media": None,
+    "meta_tag_title": None,
+    "meta_tag_description": None,
+    "seo_url": None,
+    "source_url": None,
+    "variantPrices": None,
+    "isPremium": False,
+    "is_customize": 0,
+    "variant_gender": "",
+    "approximate_delivery_days": "",
+    "selectedCustomizationFields": None,
+    "pickupAddressId": "",  # Fixed as per example
+    "packageInfo": None,
+    "isReturnable": False,
+    "maxDaysToReturn": None
+}
+EXTERNAL_PACKAGE_DIMENSIONS = {"length": "35", "width": "24", "height": "5"}
+
 def transform_to_external_format(products):
     """Transform products to exact external API format with dynamic category data"""
     transformed_products = []
     
     for product in products:
         # Skip products with "Error" in the name or no images
-        if (product.get("product_name") == "Error" or 
-            not product.get("product_images") or 
-            len(product.get("product_images", [])) == 0):
+        images = product.get("product_images")
+        if not images or product.get("product_name") == "Error":
             continue
         
         # Handle categories based on the provided structure
@@ -904,22 +1230,86 @@ def transform_to_external_format(products):
         # Get quantity from upload data, default to 1 if not provided
         quantity = str(product.get("stock", 1))  # Default to 1 if not provided
         
-        # Exact format as required
-        transformed = {
+        # Build the variant options up front so each product is assembled in one literal
+        variants = []
+        
+        # Add color variants if available
+        if product.get("colors"):
+            variants.append({
+                "optionId": "601a67fd4e966936d4f475d4",
+                "optionName": "Color",
+                "optionValues": [
+                    {
+                        "code": color.get("color_code", ""),
+                        "value": color.get("id", ""),
+                        "label": color.get("option_value_name", "")
+                    }
+                    for color in product["colors"]
+                ]
+            })
+        
+        # Add size variants if available
+        if product.get("sizes"):
+            variants.append({
+                "optionId": "601a68b54e966936d4f475db",
+                "optionName": "Size",
+                "optionValues": [
+                    {
+                        "code": "",
+                        "value": size.get("_id", ""),
+                        "label": size.get("option_value_name", "")
+                    }
+                    for size in product["sizes"]
+                ]
+            })
+        
+        # Add material variants if available
+        material_data = product.get("material")
+        if material_data:
+            if isinstance(material_data, dict) and "_id" in material_data:
+                material_values = [{
+                    "code": "",
+                    "value": material_data["_id"],
+                    "label": material_data["option_value_name"]
+                }]
+            elif isinstance(material_data, str):
+                material_values = [{
+                    "code": "",
+                    "value": material_data,
+                    "label": material_data["option_value_name"]
+                }]
+            else:
+                material_values = []
+            variants.append({
+                "optionId": "601a6a544e966936d4f475e2",
+                "optionName": "Materials",
+                "optionValues": material_values
+            })
+        
+        # Exact format as required (constant fields come from the template)
+        transformed = EXTERNAL_PRODUCT_TEMPLATE.copy()
+        transformed.update({
             "product_name": product.get("product_name", ""),
             "category_name": {
                 "label": category_label,  # Dynamic from upload data
                 "value": category_value  # Dynamic from upload data
             },
             "description": product.get("description", ""),
-            "status": "1",
             "product_image": {
-                "uploaded_image_url": product.get("product_images", [""])[0] if product.get("product_images") else "",
+                "uploaded_image_url": images[0],
                 "uploaded_image_key": "",
                 "media_type": "image"
             },
             "product_video": {},
-            "product_media": [],
+            # All images
+            "product_media": [
+                {
+                    "uploaded_image_url": img_url,
+                    "uploaded_image_key": "",
+                    "media_type": "image"
+                }
+                for img_url in images
+            ],
             "meta_tag_title": product.get("meta_title", ""),
             "meta_tag_description": product.get("meta_description", ""),
             "seo_url": product.get("slug", product.get("url", "")),
@@ -927,91 +1317,18 @@ def transform_to_external_format(products):
             "variantPrices": [
                 {
                     "rowId": 0,
-                    "variants": [],
+                    "variants": variants,
                     "quantity": quantity,  # Dynamic quantity, default 1
                     "regularPrice": str(product.get("price", 1500)),
                     "discountedPrice": str(product.get("discounted_price", product.get("price", 1400)))
                 }
             ],
-            "isPremium": False,
-            "is_customize": 0,
-            "variant_gender": "",
-            "approximate_delivery_days": "",
             "selectedCustomizationFields": [],
-            "pickupAddressId": "",  # Fixed as per example
             "packageInfo": {
                 "weight": product.get("weight", 0.5),
-                "dimensions": {
-                    "length": "35",
-                    "width": "24", 
-                    "height": "5"
-                }
-            },
-            "isReturnable": False,
-            "maxDaysToReturn": None
-        }
-        
-        # Add product media (all images)
-        for img_url in product.get("product_images", []):
-            transformed["product_media"].append({
-                "uploaded_image_url": img_url,
-                "uploaded_image_key": "",
-                "media_type": "image"
-            })
-        
-        # Add color variants if available
-        if "colors" in product and product["colors"]:
-            color_variant = {
-                "optionId": "601a67fd4e966936d4f475d4",
-                "optionName": "Color",
-                "optionValues": []
-            }
-            for color in product["colors"]:
-                color_variant["optionValues"].append({
-                    "code": color.get("color_code", ""),
-                    "value": color.get("id", ""),
-                    "label": color.get("option_value_name", "")
-                })
-            transformed["variantPrices"][0]["variants"].append(color_variant)
-        
-        # Add size variants if available
-        if "sizes" in product and product["sizes"]:
-            size_variant = {
-                "optionId": "601a68b54e966936d4f475db",
-                "optionName": "Size",
-                "optionValues": []
-            }
-            for size in product["sizes"]:
-                size_variant["optionValues"].append({
-                    "code": "",
-                    "value": size.get("_id", ""),
-                    "label": size.get("option_value_name", "")
-                })
-            transformed["variantPrices"][0]["variants"].append(size_variant)
-        
-        # Add material variants if available
-        if "material" in product and product["material"]:
-            material_variant = {
-                "optionId": "601a6a544e966936d4f475e2",
-                "optionName": "Materials",
-                "optionValues": []
+                "dimensions": dict(EXTERNAL_PACKAGE_DIMENSIONS)
             }
-            material_data = product["material"]
-            if isinstance(material_data, dict) and "_id" in material_data:
-                material_text = material_data["_id"]
-                material_label=material_data["option_value_name"]
-                material_variant["optionValues"].append({
-                    "code": "",
-                    "value": material_text,
-                    "label": material_label
-                })
-            elif isinstance(material_data, str):
-                material_variant["optionValues"].append({
-                    "code": "",
-                    "value": material_data,
-                    "label": material_data["option_value_name"]
-                })
-            transformed["variantPrices"][0]["variants"].append(material_variant)
+        })
         
         transformed_products.append(transformed)
     
@@ -1026,8 +1343,7 @@ def save_product_upload_api_data(transformed_data, timestamp):
         # Save the exact API format
         api_data_file = PRODUCT_UPLOAD_DIR / "product_upload_api_data.json"
         
-        with open(api_data_file, 'w', encoding='utf-8') as f:
-            json.dump(transformed_data, f, indent=2, ensure_ascii=False)
+        write_json_file(api_data_file, transformed_data)
         
         logger.info(f"✅ API data saved to: {api_data_file}")
         return api_data_file
@@ -1040,17 +1356,22 @@ async def send_to_external_api(transformed_data):
     try:
         external_api_url = "https://www.zotik.in/api/product/upload-scraped-product-to-particular-sellers-dashboard"
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                external_api_url, 
-                json=transformed_data,
-                headers={"Content-Type": "application/json"}
-            ) as response:
-                result = await response.json()
-                return {
-                    "status": response.status,
-                    "response": result
-                }
+        # Reuse the app-wide keep-alive session instead of a new connection per upload
+        session = app.state.http_session
+        # Encode with orjson up front rather than letting aiohttp run stdlib json.dumps
+        body = orjson.dumps(transformed_data)
+        async with session.post(
+            external_api_url, 
+            data=body,
+            headers={"Content-Type": "application/json"},
+            timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            raw = await response.read()
+            result = orjson.loads(raw) if raw.strip() else None
+            return {
+                "status": response.status,
+                "response": result
+            }
     except Exception as e:
         logger.error(f"Error sending to external API: {e}")
         return {"error": str(e)}
@@ -1061,17 +1382,48 @@ async def get_results(task_id: str):
         return {"success": False, "error": "Invalid task ID"}
 
     task = active_tasks[task_id]
-    if task["status"] != "completed":
+    # Recently read results are the last to be evicted
+    active_tasks.move_to_end(task_id)
+    if task.status != "completed":
         return {
             "success": False,
-            "status": task["status"],
-            "progress": task.get("current_progress")
+            "status": task.status,
+            "progress": task.current_progress
         }
 
+    result = task.result
+    if "products" not in result:
+        # Products were released from memory; reload them from the saved log file
+        try:
+            result = await asyncio.to_thread(read_json_file, result["result_file"])
+        except FileNotFoundError:
+            return {"success": False, "error": "Results file is no longer available"}
+
     return {
         "success": True,
         "task_id": task_id,
-        "products": task["result"]["products"]
+        "products": result["products"]
+    }
+
+def release_task_result(task_id: str):
+    """
+    Replace a completed task's in-memory result with a small summary.
+    
+    The full products list is already persisted in the FIXED log file, so
+    only its path is kept; /results/{task_id} reloads it on demand.
+    """
+    task = active_tasks.get(task_id)
+    if not task or not task.result:
+        return
+    
+    metadata = task.result.get("metadata", {})
+    if not metadata.get("fixed_file"):
+        return  # Nothing on disk to reload from
+    
+    task.result = {
+        "metadata": metadata,
+        "products_count": len(task.result.get("products", [])),
+        "result_file": metadata["fixed_file"]
     }
 
 async def run_simple_scrape_task(task_id: str, urls: List[str], max_pages: int):
@@ -1079,26 +1431,27 @@ async def run_simple_scrape_task(task_id: str, urls: List[str], max_pages: int):
     start_time = time.time()
     
     try:
-        active_tasks[task_id]["status"] = "running"
+        active_tasks[task_id].status = "running"
         
         async def progress_callback(progress_data):
             if task_id in active_tasks:
-                active_tasks[task_id]["current_progress"] = {
+                active_tasks[task_id].current_progress = {
                     **progress_data,
                     "timestamp": datetime.now().isoformat()
                 }
-                await manager.send_progress_update(task_id, {
+                manager.queue_progress_update(task_id, {
                     "type": "progress_update",
                     "data": progress_data
                 })
         
         # Initialize enhanced scraper
-        scraper = SimpleProductScraper()
+        scraper = SimpleProductScraper(http_client=app.state.http_client, parse_pool=_SCRAPE_POOL,
+                                       browser=app.state.browser)
         all_products = []
         
         for i, url in enumerate(urls):
             progress = 10 + (i * 70 // len(urls))
-            domain = urlparse(url).netloc
+            domain = _netloc(url)
             await progress_callback({
                 "stage": "scraping",
                 "percentage": progress,
@@ -1169,18 +1522,19 @@ async def run_simple_scrape_task(task_id: str, urls: List[str], max_pages: int):
         await save_fixed_results(result, timestamp, task_id)
         
         # Update task with results
-        active_tasks[task_id].update({
-            "status": "completed",
-            "result": result,
-            "end_time": datetime.now().isoformat(),
-            "processing_time": round(time.time() - start_time, 2)
-        })
+        task = active_tasks[task_id]
+        task.status = "completed"
+        task.result = result
+        task.end_time = datetime.now().isoformat()
+        task.processing_time = round(time.time() - start_time, 2)
         
         # Send completion update via WebSocket
         await manager.send_progress_update(task_id, {
             "type": "task_completed",
-            "data": active_tasks[task_id]
+            "data": task.to_dict()
         })
+        release_task_result(task_id)
+        _evict_if_needed()
         
         logger.info(f"🎉 Enhanced scraping completed! Task: {task_id}, Products: {len(all_products)}")
         
@@ -1188,25 +1542,25 @@ async def run_simple_scrape_task(task_id: str, urls: List[str], max_pages: int):
         logger.error(f"Enhanced scrape task {task_id} failed: {e}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         
-        active_tasks[task_id].update({
-            "status": "failed",
-            "error": str(e),
-            "end_time": datetime.now().isoformat(),
-            "processing_time": round(time.time() - start_time, 2)
-        })
+        task = active_tasks[task_id]
+        task.status = "failed"
+        task.error = str(e)
+        task.end_time = datetime.now().isoformat()
+        task.processing_time = round(time.time() - start_time, 2)
         
         # Send error update via WebSocket
         await manager.send_progress_update(task_id, {
             "type": "task_failed",
-            "data": active_tasks[task_id]
+            "data": task.to_dict()
         })
+        _evict_if_needed()
 
 async def run_ai_scrape_task(task_id: str, urls: List[str], max_pages_per_url: int):
     """Run the AI scraping task in the background with enhanced progress tracking"""
     start_time = time.time()
     
     try:
-        active_tasks[task_id]["status"] = "running"
+        active_tasks[task_id].status = "running"
         
         # Enhanced progress callback with more granular updates
         async def detailed_progress_callback(stage, sub_stage, progress, details=""):
@@ -1219,8 +1573,8 @@ async def run_ai_scrape_task(task_id: str, urls: List[str], max_pages_per_url: i
             }
             
             if task_id in active_tasks:
-                active_tasks[task_id]["current_progress"] = progress_data
-                await manager.send_progress_update(task_id, {
+                active_tasks[task_id].current_progress = progress_data
+                manager.queue_progress_update(task_id, {
                     "type": "progress_update",
                     "data": progress_data
                 })
@@ -1229,7 +1583,7 @@ async def run_ai_scrape_task(task_id: str, urls: List[str], max_pages_per_url: i
         
         # Initialize AI agent
         from scraper_ai_agent_deep import AIProductScraper
-        scraper = AIProductScraper()
+        scraper = AIProductScraper(http_client=app.state.http_client, browser=app.state.browser)
         
         if not scraper.ai_agent:
             await detailed_progress_callback("error", "ai_agent", 0, "AI agent not available")
@@ -1241,7 +1595,7 @@ async def run_ai_scrape_task(task_id: str, urls: List[str], max_pages_per_url: i
         
         for i, url in enumerate(urls):
             base_progress = 10 + (i * 70 // len(urls))
-            domain = urlparse(url).netloc
+            domain = _netloc(url)
             
             await detailed_progress_callback(
                 "url_processing", f"url_{i}", base_progress, 
@@ -1358,48 +1712,49 @@ async def run_ai_scrape_task(task_id: str, urls: List[str], max_pages_per_url: i
         await save_fixed_results(result, timestamp, task_id)
         
         # Update task with results
-        active_tasks[task_id].update({
-            "status": "completed",
-            "result": result,
-            "ai_stats": scraper.stats,
-            "end_time": datetime.now().isoformat(),
-            "processing_time": round(time.time() - start_time, 2),
-            "current_progress": {
-                "stage": "completed",
-                "sub_stage": "finished",
-                "percentage": 100,
-                "details": f"✅ AI scraping completed! Found {len(all_products)} products with fixed image URLs",
-                "timestamp": datetime.now().isoformat()
-            }
-        })
+        task = active_tasks[task_id]
+        task.status = "completed"
+        task.result = result
+        task.extra["ai_stats"] = scraper.stats
+        task.end_time = datetime.now().isoformat()
+        task.processing_time = round(time.time() - start_time, 2)
+        task.current_progress = {
+            "stage": "completed",
+            "sub_stage": "finished",
+            "percentage": 100,
+            "details": f"✅ AI scraping completed! Found {len(all_products)} products with fixed image URLs",
+            "timestamp": datetime.now().isoformat()
+        }
         
         # Send completion update via WebSocket
         await manager.send_progress_update(task_id, {
             "type": "task_completed",
-            "data": active_tasks[task_id]
+            "data": task.to_dict()
         })
+        release_task_result(task_id)
+        _evict_if_needed()
         
     except Exception as e:
         logger.error(f"AI scrape task {task_id} failed: {e}")
-        active_tasks[task_id].update({
-            "status": "failed",
-            "error": str(e),
-            "end_time": datetime.now().isoformat(),
-            "processing_time": round(time.time() - start_time, 2),
-            "current_progress": {
-                "stage": "failed",
-                "sub_stage": "error",
-                "percentage": 0,
-                "details": f"❌ AI scraping failed: {str(e)}",
-                "timestamp": datetime.now().isoformat()
-            }
-        })
+        task = active_tasks[task_id]
+        task.status = "failed"
+        task.error = str(e)
+        task.end_time = datetime.now().isoformat()
+        task.processing_time = round(time.time() - start_time, 2)
+        task.current_progress = {
+            "stage": "failed",
+            "sub_stage": "error",
+            "percentage": 0,
+            "details": f"❌ AI scraping failed: {str(e)}",
+            "timestamp": datetime.now().isoformat()
+        }
         
         # Send error update via WebSocket
         await manager.send_progress_update(task_id, {
             "type": "task_failed",
-            "data": active_tasks[task_id]
+            "data": task.to_dict()
         })
+        _evict_if_needed()
 async def save_ai_agent_results(result: Dict[str, Any], task_id: str):
     """Save original AI agent results to AI_AGENT_LOGS_DIR"""
     try:
@@ -1407,10 +1762,9 @@ async def save_ai_agent_results(result: Dict[str, Any], task_id: str):
         simple_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Save original version
-        original_file = AI_AGENT_LOGS_DIR / f"ai_agent_scrape_{simple_timestamp}.json"
+        original_file = AI_AGENT_LOGS_DIR / f"ai_agent_scrape_{simple_timestamp}_{task_id}.json"
         
-        with open(original_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        await asyncio.to_thread(_stream_json_result, original_file, result)
         
         # Update metadata
         if 'metadata' in result:
@@ -1430,10 +1784,9 @@ async def save_simple_scraper_results(result: Dict[str, Any], task_id: str):
         simple_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Save original version
-        original_file = ENHANCED_LOGS_DIR / f"enhanced_scrape_{simple_timestamp}.json"
+        original_file = ENHANCED_LOGS_DIR / f"enhanced_scrape_{simple_timestamp}_{task_id}.json"
         
-        with open(original_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        await asyncio.to_thread(_stream_json_result, original_file, result)
         
         # Update metadata
         if 'metadata' in result:
@@ -1446,36 +1799,25 @@ async def save_simple_scraper_results(result: Dict[str, Any], task_id: str):
     except Exception as e:
         logger.error(f"❌ Error saving enhanced scraper results: {e}")
 
-
-# In api.py, update the startup_event function
-# @app.on_event("startup")
-# async def startup_event():
-#     # Load environment variables
-#     from dotenv import load_dotenv
-#     load_dotenv()
-    
-#     # Check if Gemini API key is available
-#     api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
-#     if not api_key:
-#         logger.warning("GEMINI_API_KEY or GOOGLE_API_KEY environment variable not found. AI features will be disabled.")
-#     else:
-#         logger.info("Gemini API key found. AI features are enabled.")
-    
-#     logger.info("🚀 AI-Powered Web Scraper API started successfully!")
-#     logger.info("📊 Available scrapers: Simple Parser, AI Agent (Gemini 1.5 Flash)")
-#     logger.info("🌐 GUI available at: http://localhost:8000/")
-#     logger.info("📚 API docs available at: http://localhost:8000/docs")
-#     logger.info("🔌 WebSocket support enabled for real-time updates")
+def _stream_json_result(path, result: Dict[str, Any]) -> None:
+    """
+    Write a scrape result to disk one product at a time (blocking; run via asyncio.to_thread).
     
-#     # Create upload_data directory if it doesn't exist
-#     upload_dir = "upload_data"
-#     os.makedirs(upload_dir, exist_ok=True)
-#     logger.info(f"Ensured upload directory exists: {upload_dir}")
-#     # Create shared HTTP session with throttling
-#     app.state.http_session = ClientSession(
-#         connector=TCPConnector(limit_per_host=2),
-#         timeout=aiohttp.ClientTimeout(total=30)
-#     )
+    Peak memory is one encoded product rather than the whole JSON document.
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    with open(path, 'wb') as f:
+        f.write(b'{')
+        for key, value in result.items():
+            if key != "products":
+                f.write(orjson.dumps(key) + b':' + orjson.dumps(value, option=option) + b',')
+        f.write(b'"products":[')
+        for i, product in enumerate(result.get("products", [])):
+            if i:
+                f.write(b',')
+            f.write(orjson.dumps(product, option=option))
+        f.write(b']}')
+
 # Another option - use a simpler timestamp format
 async def save_fixed_results(result: Dict[str, Any], timestamp: str, task_id: str):
     """Save the fixed scraping results automatically in appropriate directory"""
@@ -1496,11 +1838,10 @@ async def save_fixed_results(result: Dict[str, Any], timestamp: str, task_id: st
         # Use a simpler timestamp format without colons or periods
         simple_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Save the fixed version
-        fixed_file = logs_dir / f"{file_prefix}{simple_timestamp}_FIXED.json"
+        # Save the fixed version; the task ID keeps tasks finishing in the same second apart
+        fixed_file = logs_dir / f"{file_prefix}{simple_timestamp}_{task_id}_FIXED.json"
         
-        with open(fixed_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        await asyncio.to_thread(_stream_json_result, fixed_file, result)
         
         # Log the successful save
         logger.info(f"✅ Fixed results saved to: {fixed_file}")
@@ -1515,53 +1856,6 @@ async def save_fixed_results(result: Dict[str, Any], timestamp: str, task_id: st
     except Exception as e:
         logger.error(f"❌ Error saving fixed results: {e}")
 
-# Create a shared HTTP session for all requests
-@app.on_event("startup")
-async def startup_event():
-    # Load environment variables
-    from dotenv import load_dotenv
-    load_dotenv()
-    
-    # Create all log directories
-    LOGS_BASE_DIR.mkdir(parents=True, exist_ok=True)
-    AI_AGENT_LOGS_DIR.mkdir(parents=True, exist_ok=True)
-    ENHANCED_LOGS_DIR.mkdir(parents=True, exist_ok=True)
-    CRON_LOGS_DIR.mkdir(parents=True, exist_ok=True)
-    UPLOAD_LOGS_DIR.mkdir(parents=True, exist_ok=True)
-    PRODUCT_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)  
-    # Check if Gemini API key is available
-    api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
-    if not api_key:
-        logger.warning("GEMINI_API_KEY or GOOGLE_API_KEY environment variable not found. AI features will be disabled.")
-    else:
-        logger.info("Gemini API key found. AI features are enabled.")
-    
-    logger.info("🚀 AI-Powered Web Scraper API started successfully!")
-    logger.info("📊 Available scrapers: Simple Parser, AI Agent (Gemini 1.5 Flash)")
-    logger.info("🌐 GUI available at: http://localhost:8000/")
-    logger.info("📚 API docs available at: http://localhost:8000/docs")
-    logger.info("🔌 WebSocket support enabled for real-time updates")
-    logger.info("📁 Log directories created:")
-    logger.info(f"   - AI Agent logs: {AI_AGENT_LOGS_DIR}")
-    logger.info(f"   - Enhanced logs: {ENHANCED_LOGS_DIR}")
-    logger.info(f"   - Cron logs: {CRON_LOGS_DIR}")
-    logger.info(f"   - Upload logs: {UPLOAD_LOGS_DIR}")
-    logger.info(f"   - Product upload API data: {PRODUCT_UPLOAD_DIR}")
-    # Create upload_data directory if it doesn't exist
-    upload_dir = "upload_data"
-    os.makedirs(upload_dir, exist_ok=True)
-    logger.info(f"Ensured upload directory exists: {upload_dir}")
-    
-    # Create shared HTTP session with throttling
-    app.state.http_session = ClientSession(
-        connector=TCPConnector(limit_per_host=2),
-        timeout=aiohttp.ClientTimeout(total=30)
-    )
-@app.on_event("shutdown")
-async def shutdown_event():
-    # Close HTTP session
-    await app.state.http_session.close()
-
 class TaskTerminationRequest(BaseModel):
     """Model for task termination request"""
     task_ids: List[str]
@@ -1585,10 +1879,11 @@ async def terminate_tasks(request: TaskTerminationRequest):
                     continue
                 
                 # Update task status to terminated
-                if active_tasks[task_id]["status"] in ["running", "started"]:
-                    active_tasks[task_id]["status"] = "terminated"
-                    active_tasks[task_id]["end_time"] = datetime.now().isoformat()
-                    active_tasks[task_id]["termination_reason"] = request.reason
+                task = active_tasks[task_id]
+                if task.status in ["running", "started"]:
+                    task.status = "terminated"
+                    task.end_time = datetime.now().isoformat()
+                    task.extra["termination_reason"] = request.reason
                     
                     # Send termination message to WebSocket connections
                     await manager.send_progress_update(task_id, {
@@ -1609,7 +1904,7 @@ async def terminate_tasks(request: TaskTerminationRequest):
                 else:
                     failed_terminations.append({
                         "task_id": task_id,
-                        "reason": f"Task status is '{active_tasks[task_id]['status']}', cannot terminate"
+                        "reason": f"Task status is '{task.status}', cannot terminate"
                     })
                     
             except Exception as e:
@@ -1644,14 +1939,14 @@ async def get_active_tasks():
         active_task_list = []
         
         for task_id, task_data in active_tasks.items():
-            if task_data["status"] in ["started", "running"]:
+            if task_data.status in ["started", "running"]:
                 active_task_list.append({
                     "task_id": task_id,
-                    "status": task_data["status"],
-                    "scraper_type": task_data["scraper_type"],
-                    "start_time": task_data["start_time"],
-                    "urls_count": len(task_data.get("urls", [])),
-                    "current_progress": task_data.get("current_progress", {})
+                    "status": task_data.status,
+                    "scraper_type": task_data.scraper_type,
+                    "start_time": task_data.start_time,
+                    "urls_count": len(task_data.urls),
+                    "current_progress": task_data.current_progress or {}
                 })
         
         return {
@@ -1748,6 +2043,35 @@ async def fetch_html(client, url):
         return None
     return None
 
+# Threads for get-domain-urls page parsing; selectolax releases the GIL while parsing
+_HTML_PARSE_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 4), thread_name_prefix="htmlparse"
+)
+
+def _extract_site_links(html: str, base_url: str, base_netloc: str) -> set:
+    """Absolute URLs of all anchors on the page that stay on base_netloc"""
+    sublinks = set()
+    for a in HTMLParser(html).tags("a"):
+        href = a.attributes.get("href")
+        if not href:
+            continue
+        full_url = urljoin(base_url, href)
+        if _netloc(full_url) == base_netloc:
+            sublinks.add(full_url)
+    return sublinks
+
+# Shopify (/products/) and WooCommerce (/product/) product paths
+_PRODUCT_LINK_RE = re.compile(r"/products?/")
+
+def _extract_product_links(html: str, base_url: str) -> set:
+    """Absolute URLs of Shopify (/products/) and WooCommerce (/product/) links on the page"""
+    product_links = set()
+    for a in HTMLParser(html).tags("a"):
+        href = a.attributes.get("href")
+        if href and _PRODUCT_LINK_RE.search(href):
+            product_links.add(urljoin(base_url, href))
+    return product_links
+
 @app.post("/api/get-domain-urls")
 async def get_domain_urls(req: UrlRequest):
     try:
@@ -1755,75 +2079,67 @@ async def get_domain_urls(req: UrlRequest):
         if not base_url.startswith(("http://", "https://")):
             base_url = "https://" + base_url  # default try https
 
-        headers = {"User-Agent": "Mozilla/5.0"}
+        # Shared keep-alive client, so repeated scans of a domain reuse connections
+        client = app.state.crawl_client
 
-        async with httpx.AsyncClient(
-            timeout=httpx.Timeout(15.0, connect=5.0),
-            verify=False,
-            follow_redirects=True,
-            headers=headers
-        ) as client:
-            # Try HTTPS first, fallback to HTTP if fails
+        # Try HTTPS first, fallback to HTTP if fails
+        html = await fetch_html(client, base_url)
+        if not html and base_url.startswith("https://"):
+            base_url = base_url.replace("https://", "http://", 1)
             html = await fetch_html(client, base_url)
-            if not html and base_url.startswith("https://"):
-                base_url = base_url.replace("https://", "http://", 1)
-                html = await fetch_html(client, base_url)
-            if not html:
-                raise HTTPException(status_code=400, detail="Unable to fetch the site")
-
-            tree = HTMLParser(html)
-            sublinks = set()
-            for a in tree.css("a[href]"):
-                href = a.attributes.get("href")
-                if not href:
-                    continue
-                full_url = urljoin(base_url, href)
-                if urlparse(full_url).netloc == urlparse(base_url).netloc:
-                    sublinks.add(full_url)
+        if not html:
+            raise HTTPException(status_code=400, detail="Unable to fetch the site")
+
+        loop = asyncio.get_running_loop()
+        base_netloc = _netloc(base_url)
+        sublinks = await loop.run_in_executor(
+            _HTML_PARSE_POOL, _extract_site_links, html, base_url, base_netloc
+        )
 
-            # limit crawling
-            sublinks = sorted(list(sublinks))
+        # limit crawling
+        sublinks = sorted(sublinks)
 
-            semaphore = asyncio.Semaphore(5)
-            async def fetch(url):
-                async with semaphore:
-                    try:
-                        return url, await client.get(url)
-                    except Exception:
-                        return url, None
+        semaphore = asyncio.Semaphore(32)
+        async def fetch(url):
+            async with semaphore:
+                try:
+                    return url, await client.get(url)
+                except Exception:
+                    return url, None
 
-            responses = await asyncio.gather(*[fetch(u) for u in sublinks])
+        # Parse each page as soon as it arrives instead of waiting for the slowest one
+        fetches = [asyncio.create_task(fetch(u)) for u in sublinks]
 
-            collections_with_products, product_urls, urls_array = [], set(), set()
-            for url, res in responses:
+        collections_with_products, product_urls, urls_array = [], set(), set()
+        try:
+            for next_response in asyncio.as_completed(fetches):
+                url, res = await next_response
                 if not res or res.status_code != 200:
                     continue
-                tree = HTMLParser(res.text)
-
                 # Detect Shopify (/products/) and WooCommerce (/product/)
-                product_links = [
-                    urljoin(base_url, a.attributes.get("href"))
-                    for a in tree.css("a[href]")
-                    if a.attributes.get("href") and (
-                        "/products/" in a.attributes["href"] or "/product/" in a.attributes["href"]
-                    )
-                ]
+                product_links = await loop.run_in_executor(
+                    _HTML_PARSE_POOL, _extract_product_links, res.text, base_url
+                )
 
                 if product_links:
                     collections_with_products.append(url)
                     product_urls.update(product_links)
 
                 urls_array.add(url)
+        finally:
+            # On errors or client disconnects, stop crawling the site
+            for fetch_task in fetches:
+                fetch_task.cancel()
 
-            return {
-                "success": True,
-                "base_url": base_url,
-                "collections_count": len(collections_with_products),
-                "collections_with_products": sorted(collections_with_products),
-                "total_products": len(product_urls),
-                "all_product_urls": sorted(product_urls),
-                "urls_array": sorted(urls_array)
-            }
+        return {
+            "success": True,
+            "base_url": base_url,
+            "collections_count": len(collections_with_products),
+            "collections_with_products": sorted(collections_with_products),
+            "total_products": len(product_urls),
+            "all_product_urls": sorted(product_urls),
+            "urls_array": sorted(urls_array)
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scraping: {str(e)}")
@@ -1834,7 +2150,7 @@ async def cleanup_terminated_tasks(task_ids: List[str], delay_seconds: int = 30)
         await asyncio.sleep(delay_seconds)
         
         for task_id in task_ids:
-            if task_id in active_tasks and active_tasks[task_id]["status"] == "terminated":
+            if task_id in active_tasks and active_tasks[task_id].status == "terminated":
                 del active_tasks[task_id]
                 logger.info(f"🗑️ Cleaned up terminated task {task_id} from memory")
                 
@@ -1848,6 +2164,34 @@ DATA_DIR = "data"
 os.makedirs(DATA_DIR, exist_ok=True)
 TARGETS_FILE = os.path.join(DATA_DIR, "targets.json")
 
+def append_targets_entry(urls: List[str]) -> int:
+    """Append a timestamped batch of URLs to targets.json and return the entry count (blocking)"""
+    # Load existing data if file exists
+    if os.path.exists(TARGETS_FILE):
+        try:
+            data = read_json_file(TARGETS_FILE)
+        except orjson.JSONDecodeError:
+            data = []
+    else:
+        data = []
+
+    # Ensure file is a list
+    if not isinstance(data, list):
+        data = [data]
+
+    # Append new entry
+    entry = {
+        "timestamp": datetime.now().isoformat(),
+        "count": len(urls),
+        "urls": urls
+    }
+    data.append(entry)
+
+    # Save back
+    write_json_file(TARGETS_FILE, data)
+
+    return len(data)
+
 @app.post("/api/save-urls")
 async def save_urls(req: SaveUrlsRequest):
     """
@@ -1859,34 +2203,10 @@ async def save_urls(req: SaveUrlsRequest):
         if not urls:
             raise HTTPException(status_code=400, detail="No valid URLs provided")
 
-        # Load existing data if file exists
-        if os.path.exists(TARGETS_FILE):
-            with open(TARGETS_FILE, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                except json.JSONDecodeError:
-                    data = []
-        else:
-            data = []
-
-        # Ensure file is a list
-        if not isinstance(data, list):
-            data = [data]
-
-        # Append new entry
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "count": len(urls),
-            "urls": urls
-        }
-        data.append(entry)
-
-        # Save back
-        with open(TARGETS_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        total_entries = await asyncio.to_thread(append_targets_entry, urls)
 
         logger.info(f"✅ Appended {len(urls)} URLs into {TARGETS_FILE}")
-        return {"success": True, "count": len(urls), "total_entries": len(data), "file": TARGETS_FILE}
+        return {"success": True, "count": len(urls), "total_entries": total_entries, "file": TARGETS_FILE}
 
     except Exception as e:
         logger.error(f"❌ Failed to save URLs: {e}")
@@ -1906,9 +2226,11 @@ async def scrape_ai(req: SaveUrlsRequest, background_tasks: BackgroundTasks):
 
     async def run_scraper():
         try:
-            result = await scrape_urls_simple_api(urls, max_pages=50)
-            with open(out_file, "w", encoding="utf-8") as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            result = await scrape_urls_simple_api(
+                urls, max_pages=50, http_client=app.state.http_client, parse_pool=_SCRAPE_POOL,
+                browser=app.state.browser
+            )
+            await asyncio.to_thread(write_json_file, out_file, result)
             logger.info(f"Scrape results written to {out_file}")
         except Exception as e:
             logger.exception(f"Scrape failed: {e}")
@@ -1920,4 +2242,9 @@ async def scrape_ai(req: SaveUrlsRequest, background_tasks: BackgroundTasks):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    try:
+        import uvloop  # noqa: F401 - not available on Windows
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop, http="httptools", workers=1)
\ No newline at end of file
@@ -4,8 +4,8 @@ Script to fix image URLs in existing scraping log files
 """
 
 import os
-import glob
-from image_url_fixer import fix_json_file
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from image_url_fixer import fix_json_file_streaming
 
 def fix_all_logs(logs_dir='logs'):
     """
@@ -18,8 +18,12 @@ def fix_all_logs(logs_dir='logs'):
         print(f"❌ Logs directory not found: {logs_dir}")
         return
     
-    # Find all JSON log files
-    json_files = glob.glob(os.path.join(logs_dir, "*.json"))
+    # Find all JSON log files that still need fixing (DirEntry caches the stat)
+    json_files = [
+        entry.path for entry in os.scandir(logs_dir)
+        if entry.name.endswith(('.json', '.json.gz')) and '_FIXED' not in entry.name
+        and entry.is_file() and entry.stat().st_size > 0
+    ]
     
     if not json_files:
         print(f"❌ No JSON files found in {logs_dir}")
@@ -27,31 +31,32 @@ def fix_all_logs(logs_dir='logs'):
     
     print(f"🔍 Found {len(json_files)} JSON files to process:")
     
-    for json_file in json_files:
-        print(f"\n📂 Processing: {os.path.basename(json_file)}")
+    # Create output filenames
+    jobs = [(json_file, f"{json_file.rsplit('.json', 1)[0]}_FIXED.json") for json_file in json_files]
+    
+    # Each file is independent, so fix them in parallel across all cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {
+            executor.submit(fix_json_file_streaming, json_file, output_file): json_file
+            for json_file, output_file in jobs
+        }
         
-        try:
-            # Create output filename
-            base_name = os.path.splitext(json_file)[0]
-            output_file = f"{base_name}_FIXED.json"
-            
-            # Skip if already processed
-            if "_FIXED" in json_file:
-                print(f"   ⚪ Skipping (already fixed)")
-                continue
-            
-            # Fix the file
-            data = fix_json_file(json_file, output_file)
+        for future in as_completed(futures):
+            json_file = futures[future]
+            print(f"\n📂 Processed: {os.path.basename(json_file)}")
             
-            if data and 'products' in data:
-                products_count = len(data['products'])
-                fixed_count = data.get('metadata', {}).get('products_with_fixed_images', 0)
-                print(f"   ✅ Success: {products_count} products, {fixed_count} had image URLs fixed")
-            else:
-                print(f"   ⚠️ Warning: No products found in file")
+            try:
+                summary = future.result()
                 
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
+                if summary['products_count']:
+                    products_count = summary['products_count']
+                    fixed_count = summary['products_with_fixed_images']
+                    print(f"   ✅ Success: {products_count} products, {fixed_count} had image URLs fixed")
+                else:
+                    print(f"   ⚠️ Warning: No products found in file")
+                    
+            except Exception as e:
+                print(f"   ❌ Error: {e}")
 
 def main():
     print("🔧 Image URL Fixer for Existing Log Files")
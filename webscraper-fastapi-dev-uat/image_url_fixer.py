@@ -1,13 +1,94 @@
 import re
-from urllib.parse import urlparse, parse_qs, urlencode
-import json
+import asyncio
+import base64
+import gzip
+import functools
+import orjson
+import ijson
+import logging
 import os
+import struct
+import time
+from urllib.parse import urlsplit
 from datetime import datetime
-from PIL import Image
+from PIL import ImageFile
 import requests
-from io import BytesIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_IMAGE_SIZE = {"width": 800, "height": 800}
+# Upper bound on bytes fetched per probe; parsing stops as soon as the header is read
+PROBE_RANGE = 'bytes=0-65535'
+
+# width=1 / height=1 query params mark a placeholder image
+_PLACEHOLDER_RE = re.compile(r'[?&](?:width|height)=1(?=&|#|$)')
+# scheme://host/path and query, without the fragment
+_URL_SPLIT_RE = re.compile(r'^([^?#]*)(?:\?([^#]*))?')
+_KEEP_RE = re.compile(r'(?:^|&)(v|version|quality|format)=([^&]+)')
+# Shopify-style size suffix in the file name, e.g. product_800x800.jpg
+_SIZE_IN_PATH_RE = re.compile(r'_(\d+)x(\d+)\.(?:jpg|jpeg|png|webp|gif)', re.I)
+
+_SVG_B64_PREFIX = 'data:image/svg+xml;base64,'
+
+def _b64_needles(marker):
+    """
+    Base64 fragments of a byte string, one per alignment (offset mod 3)
+    
+    Any base64 text whose decoded bytes contain the marker contains at
+    least one of these fragments, so their absence rules the marker out.
+    """
+    needles = []
+    for offset in range(3):
+        encoded = base64.b64encode(b'\0' * offset + marker).decode()
+        # Skip characters mixed with the padding bytes or with whatever follows the marker
+        start = -(-8 * offset // 6)
+        end = 8 * (offset + len(marker)) // 6
+        needles.append(encoded[start:end])
+    return tuple(needles)
+
+# Markers of a transparent placeholder SVG, as base64 fragments
+_PLACEHOLDER_NEEDLES = tuple(
+    _b64_needles(marker) for marker in (b'fill="none"', b'fill-opacity="0"', b'99999')
+)
+
+# One session so size probes reuse TCP/TLS connections (pooled per host, with retries).
+# Read timeouts are not retried: a hung host would otherwise cost ~3x the timeout
+# before the circuit breaker below counts a single failure.
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(
+    pool_connections=20, pool_maxsize=100,
+    max_retries=Retry(connect=2, read=0, status=2, backoff_factor=0.3)
+))
+# url -> (ETag, size) of the last successful probe, for HEAD revalidation
+_HEAD_CACHE = LRUCache(maxsize=10000)
+_HEAD_CACHE_LOCK = threading.Lock()
+
+# Per-host circuit breaker: after HOST_FAILURE_LIMIT consecutive timeouts/5xx
+# a host is skipped (default size) for HOST_COOLDOWN_SECONDS
+HOST_FAILURE_LIMIT = 3
+HOST_COOLDOWN_SECONDS = 60
+# host -> (consecutive failures, skip-until timestamp)
+_HOST_STATE = {}
+_HOST_STATE_LOCK = threading.Lock()
+
+def _host_tripped(host):
+    with _HOST_STATE_LOCK:
+        state = _HOST_STATE.get(host)
+    return state is not None and state[1] > time.time()
+
+def _record_host_failure(host):
+    with _HOST_STATE_LOCK:
+        failures = _HOST_STATE.get(host, (0, 0))[0] + 1
+        until = time.time() + HOST_COOLDOWN_SECONDS if failures >= HOST_FAILURE_LIMIT else 0
+        _HOST_STATE[host] = (failures, until)
+
+def _record_host_success(host):
+    with _HOST_STATE_LOCK:
+        _HOST_STATE.pop(host, None)
 
 def fix_image_url(url):
     """
@@ -26,48 +107,108 @@ def fix_image_url(url):
     if url.startswith('data:'):
         return url
     
+    # Check if this is a 1x1 placeholder image (most URLs are not, so no parsing needed)
+    if not (_PLACEHOLDER_RE.search(url) or ('width=1' in url and 'height=1' in url)):
+        return url
+    
     try:
-        # Parse the URL
-        parsed = urlparse(url)
+        base, query = _URL_SPLIT_RE.match(url).groups()
         
-        # Parse query parameters
-        params = parse_qs(parsed.query)
+        # Keep only useful parameters (v, version, quality, format)
+        new_query = '&'.join(f"{name}={value}" for name, value in _KEEP_RE.findall(query or ''))
         
-        # Remove problematic parameters that create placeholder images
-        problematic_params = ['width', 'height', 'crop']
+        # Rebuild the URL without placeholder parameters
+        fixed_url = base
         
-        # Check if this is a 1x1 placeholder image
-        is_placeholder = (
-            params.get('width') == ['1'] or 
-            params.get('height') == ['1'] or
-            ('width=1' in url and 'height=1' in url)
-        )
+        if new_query:
+            fixed_url += f"?{new_query}"
         
-        if is_placeholder:
-            # Keep only useful parameters
-            useful_params = {}
-            keep_params = ['v', 'version', 'quality', 'format']
-            
-            for param, values in params.items():
-                if param in keep_params:
-                    useful_params[param] = values
-            
-            # Rebuild the URL without placeholder parameters
-            new_query = urlencode(useful_params, doseq=True)
-            fixed_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-            
-            if new_query:
-                fixed_url += f"?{new_query}"
-            
-            return fixed_url
-        
-        return url
+        return fixed_url
         
     except Exception as e:
         print(f"Error fixing URL {url}: {e}")
         return url
 
 
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def _parse_jpeg_size(buf):
+    """Walk the JPEG segments up to the first SOF and read its dimensions"""
+    pos = 2
+    while pos + 4 <= len(buf):
+        if buf[pos] != 0xFF:
+            return None
+        marker = buf[pos + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Standalone markers carry no length
+            pos += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            if pos + 9 > len(buf):
+                return None
+            height, width = struct.unpack('>HH', buf[pos + 5:pos + 9])
+            return {"width": width, "height": height}
+        pos += 2 + struct.unpack('>H', buf[pos + 2:pos + 4])[0]
+    return None
+
+def _parse_webp_size(buf):
+    """Read the canvas size from a VP8, VP8L or VP8X WebP header"""
+    chunk = buf[12:16]
+    if chunk == b'VP8 ' and len(buf) >= 30:
+        width, height = struct.unpack('<HH', buf[26:30])
+        return {"width": width & 0x3FFF, "height": height & 0x3FFF}
+    if chunk == b'VP8L' and len(buf) >= 25:
+        bits = int.from_bytes(buf[21:25], 'little')
+        return {"width": (bits & 0x3FFF) + 1, "height": ((bits >> 14) & 0x3FFF) + 1}
+    if chunk == b'VP8X' and len(buf) >= 30:
+        return {
+            "width": int.from_bytes(buf[24:27], 'little') + 1,
+            "height": int.from_bytes(buf[27:30], 'little') + 1
+        }
+    return None
+
+def parse_image_size(buf):
+    """
+    Read image dimensions straight from the header bytes
+    
+    Handles PNG, GIF, JPEG and WebP, which covers what the shop CDNs serve.
+    
+    Args:
+        buf (bytes): Leading bytes of the image, possibly partial
+        
+    Returns:
+        dict: {"width", "height"}, or None if the format is unknown or
+        the header is not complete yet
+    """
+    if buf[:8] == b'\x89PNG\r\n\x1a\n':
+        if len(buf) < 24:
+            return None
+        width, height = struct.unpack('>II', buf[16:24])
+    elif buf[:6] in (b'GIF87a', b'GIF89a'):
+        if len(buf) < 10:
+            return None
+        width, height = struct.unpack('<HH', buf[6:10])
+    elif buf[:4] == b'RIFF' and buf[8:12] == b'WEBP':
+        return _parse_webp_size(buf)
+    elif buf[:2] == b'\xff\xd8':
+        return _parse_jpeg_size(buf)
+    else:
+        return None
+    return {"width": width, "height": height}
+
+def _parse_image_size_fallback(buf):
+    """Let Pillow identify formats parse_image_size doesn't know"""
+    parser = ImageFile.Parser()
+    parser.feed(bytes(buf))
+    if parser.image is None:
+        raise ValueError("image header not found")
+    return {"width": parser.image.size[0], "height": parser.image.size[1]}
+
 # Update the image_url_fixer.py to include size detection
 def get_image_size(url):
     """Get image dimensions with timeout and error handling"""
@@ -75,17 +216,53 @@ def get_image_size(url):
         # Skip data URLs
         if url.startswith('data:'):
             return DEFAULT_IMAGE_SIZE
-            
-        # Set timeout to avoid blocking
-        response = requests.get(url, timeout=5, stream=True)
-        response.raise_for_status()
         
-        # Only download first few bytes to get dimensions
-        img_data = response.content[:1024]  # First 1KB should be enough for headers
+        # The URL already names the size - no request needed
+        match = _SIZE_IN_PATH_RE.search(url)
+        if match:
+            return {"width": int(match.group(1)), "height": int(match.group(2))}
+        
+        host = urlsplit(url).netloc
+        if _host_tripped(host):
+            return DEFAULT_IMAGE_SIZE
+        
+        etag = None
+        # Seen before: revalidate with a HEAD and reuse the size if the ETag still matches
+        with _HEAD_CACHE_LOCK:
+            cached = _HEAD_CACHE.get(url)
+        if cached:
+            head = _session.head(url, timeout=5, allow_redirects=True)
+            if head.status_code == 200:
+                etag = head.headers.get('ETag')
+                if etag and etag == cached[0]:
+                    _record_host_success(host)
+                    return cached[1]
         
-        # Try to get image size without downloading entire file
-        img = Image.open(BytesIO(img_data))
-        return {"width": img.width, "height": img.height}
+        # Read the start of the file until the header gives up the dimensions
+        buf = bytearray()
+        size = None
+        with _session.get(url, headers={'Range': PROBE_RANGE}, timeout=5, stream=True) as response:
+            if response.status_code >= 500:
+                _record_host_failure(host)
+            response.raise_for_status()
+            etag = response.headers.get('ETag') or etag
+            for chunk in response.iter_content(chunk_size=1024):
+                buf += chunk
+                size = parse_image_size(buf)
+                if size:
+                    break
+        
+        if size is None:
+            size = _parse_image_size_fallback(buf)
+        if etag:
+            with _HEAD_CACHE_LOCK:
+                _HEAD_CACHE[url] = (etag, size)
+        _record_host_success(host)
+        return size
+    except (requests.Timeout, requests.ConnectionError) as e:
+        _record_host_failure(host)
+        logger.warning(f"Could not get image size for {url}: {e}")
+        return DEFAULT_IMAGE_SIZE
     except Exception as e:
         logger.warning(f"Could not get image size for {url}: {e}")
         return DEFAULT_IMAGE_SIZE
@@ -135,19 +312,29 @@ def is_transparent_placeholder(url):
     Returns:
         bool: True if it's a transparent placeholder
     """
-    if not url or not url.startswith('data:image/svg+xml;base64,'):
+    if not url or not url.startswith(_SVG_B64_PREFIX):
+        return False
+    
+    # Reject on the base64 text directly; only likely matches are decoded
+    body = url[len(_SVG_B64_PREFIX):]
+    if not all(any(needle in body for needle in needles) for needles in _PLACEHOLDER_NEEDLES):
         return False
     
+    return _is_transparent_svg(body)
+
+# The same placeholder SVG repeats across a catalog. Only bodies that passed the
+# needle check are cached, never arbitrary (possibly huge) data URLs.
+@functools.lru_cache(maxsize=1024)
+def _is_transparent_svg(body):
+    """Decode a base64 SVG body and check for the transparent-placeholder markers"""
     try:
-        import base64
-        base64_data = url.split(',')[1]
-        decoded_svg = base64.b64decode(base64_data).decode('utf-8')
+        decoded_svg = base64.b64decode(body)
         
         # Check if it's a transparent placeholder
         return (
-            'fill="none"' in decoded_svg and 
-            'fill-opacity="0"' in decoded_svg and 
-            '99999' in decoded_svg
+            b'fill="none"' in decoded_svg and 
+            b'fill-opacity="0"' in decoded_svg and 
+            b'99999' in decoded_svg
         )
     except:
         return False
@@ -166,20 +353,15 @@ def fix_json_file(input_file, output_file=None):
     if not os.path.exists(input_file):
         raise FileNotFoundError(f"Input file not found: {input_file}")
     
-    # Read the JSON file
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Read the JSON file (cron logs are written gzip-compressed)
+    opener = gzip.open if input_file.endswith('.gz') else open
+    with opener(input_file, 'rb') as f:
+        data = orjson.loads(f.read())
     
     # Fix product images
     if 'products' in data:
         for product in data['products']:
-            if 'product_images' in product:
-                original_count = len(product['product_images'])
-                product['product_images'] = fix_product_images(product['product_images'])
-                fixed_count = len(product['product_images'])
-                
-                if original_count != fixed_count:
-                    print(f"Product '{product.get('product_name', 'Unknown')}': {original_count} -> {fixed_count} images")
+            _fix_product_entry(product)
     
     # Update metadata
     if 'metadata' in data:
@@ -188,12 +370,152 @@ def fix_json_file(input_file, output_file=None):
     
     # Save to output file
     if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         print(f"Fixed JSON saved to: {output_file}")
     
     return data
 
+def _fix_product_entry(product):
+    """Fix one product's images in place; True if the image count changed"""
+    if 'product_images' not in product:
+        return False
+    original_count = len(product['product_images'])
+    product['product_images'], product['image_sizes'] = fix_product_images(product['product_images'])
+    new_count = len(product['product_images'])
+    
+    if original_count != new_count:
+        print(f"Product '{product.get('product_name', 'Unknown')}': {original_count} -> {new_count} images")
+        return True
+    return False
+
+def _iter_prefixed_items(f, prefixes):
+    """
+    Yield (prefix, value) for every JSON value found at one of the ijson prefixes
+    
+    Like ijson.items, but for several prefixes in a single pass over the file.
+    """
+    builder = None
+    current = None
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == current and event in ('end_map', 'end_array'):
+                yield current, builder.value
+                builder = None
+        elif prefix in prefixes and event != 'map_key':
+            if event in ('start_map', 'start_array'):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                current = prefix
+            else:
+                yield prefix, value
+
+def fix_json_file_streaming(input_file, output_file=None):
+    """
+    Fix image URLs in a JSON file containing scraped products, streaming it
+    
+    Unlike fix_json_file, the data is never held in memory as a whole:
+    metadata and products are read in one ijson pass and written out with
+    orjson one product at a time, so memory use stays at a single product
+    however large the log is.
+    
+    Args:
+        input_file (str): Path to input JSON file
+        output_file (str): Path to output JSON file (optional)
+        
+    Returns:
+        dict: Updated metadata plus product and fixed-product counts
+    """
+    if not os.path.exists(input_file):
+        raise FileNotFoundError(f"Input file not found: {input_file}")
+    
+    metadata = None
+    products_count = 0
+    fixed_count = 0
+    # Whether a top-level field has been written yet / the products array is still open
+    wrote_field = False
+    products_open = False
+    
+    # Cron logs are written gzip-compressed
+    opener = gzip.open if input_file.endswith('.gz') else open
+    
+    with opener(input_file, 'rb') as f:
+        out = open(output_file, 'wb') if output_file else None
+        try:
+            if out:
+                out.write(b'{')
+            
+            # Fields are written in the order they appear in the input
+            for prefix, value in _iter_prefixed_items(f, ('metadata', 'products.item')):
+                if prefix == 'metadata':
+                    if not isinstance(value, dict):
+                        continue
+                    # Update metadata
+                    metadata = value
+                    metadata['image_urls_fixed'] = True
+                    metadata['fixed_timestamp'] = str(datetime.now())
+                    if out:
+                        if products_open:
+                            out.write(b'\n]')
+                            products_open = False
+                        if wrote_field:
+                            out.write(b',')
+                        out.write(b'"metadata":' + orjson.dumps(metadata))
+                        wrote_field = True
+                    continue
+                
+                # Fix product images
+                if _fix_product_entry(value):
+                    fixed_count += 1
+                
+                if out:
+                    if products_open:
+                        out.write(b',\n')
+                    else:
+                        if wrote_field:
+                            out.write(b',')
+                        out.write(b'"products":[\n')
+                        products_open = wrote_field = True
+                    out.write(orjson.dumps(value))
+                products_count += 1
+            
+            if out:
+                if products_open:
+                    out.write(b'\n]')
+                elif not products_count:
+                    out.write((b',' if wrote_field else b'') + b'"products":[]')
+                out.write(b'}')
+        finally:
+            if out:
+                out.close()
+    
+    if output_file:
+        print(f"Fixed JSON saved to: {output_file}")
+    
+    return {
+        "metadata": metadata,
+        "products_count": products_count,
+        "products_with_fixed_images": fixed_count
+    }
+
+async def fix_json_file_async(input_file, output_file=None):
+    """
+    Async version of fix_json_file_streaming for use inside an event loop
+    
+    The streaming parse, the size probes and the writes all run in a worker
+    thread, so the loop stays responsive and several files can be fixed
+    concurrently (e.g. with asyncio.gather).
+    
+    Args:
+        input_file (str): Path to input JSON file
+        output_file (str): Path to output JSON file (optional)
+        
+    Returns:
+        dict: Same summary as fix_json_file_streaming
+    """
+    return await asyncio.to_thread(fix_json_file_streaming, input_file, output_file)
+
 def test_url_fixing():
     """Test the URL fixing function with examples"""
     test_urls = [
@@ -1,154 +1,183 @@
-import re
-from urllib.parse import urlparse, parse_qs, urlencode
 import json
 import os
+from urllib.parse import urlsplit
 from datetime import datetime
-from PIL import Image
-import requests
-from io import BytesIO
-import concurrent.futures
+from image_url_fixer import (
+    DEFAULT_IMAGE_SIZE, PROBE_RANGE, _SIZE_IN_PATH_RE,
+    fix_image_url, is_transparent_placeholder, parse_image_size, _parse_image_size_fallback,
+    _host_tripped, _record_host_failure, _record_host_success
+)
+from cachetools import LRUCache
+import itertools
 import asyncio
+import httpx
 
-DEFAULT_IMAGE_SIZE = {"width": 800, "height": 800}
+# url -> (ETag, size) of the last successful probe, for HEAD revalidation
+_HEAD_CACHE = LRUCache(maxsize=10000)
 
-def fix_image_url(url):
+# Size probes in flight at once per batch; an unbounded gather would queue on the
+# client's connection pool and hit the (pool-inclusive) timeout for healthy hosts
+PROBE_CONCURRENCY = 20
+
+def create_probe_client():
     """
-    Fix image URLs by removing placeholder parameters that make them 1x1 pixels
+    Create the HTTP client used for image size probes
+    
+    HTTP/2 lets one connection per CDN host carry many probes at once;
+    failed connection attempts are retried twice.
     
-    Args:
-        url (str): Original image URL
-        
     Returns:
-        str: Fixed URL with full-size image parameters
+        httpx.AsyncClient: Client to pass to the fix_* helpers (caller closes it)
     """
-    if not url or not isinstance(url, str):
-        return url
-    
-    # Skip data URLs (base64 encoded images)
-    if url.startswith('data:'):
-        return url
-    
-    try:
-        # Parse the URL
-        parsed = urlparse(url)
-        
-        # Parse query parameters
-        params = parse_qs(parsed.query)
-        
-        # Remove problematic parameters that create placeholder images
-        problematic_params = ['width', 'height', 'crop']
-        
-        # Check if this is a 1x1 placeholder image
-        is_placeholder = (
-            params.get('width') == ['1'] or 
-            params.get('height') == ['1'] or
-            ('width=1' in url and 'height=1' in url)
-        )
-        
-        if is_placeholder:
-            # Keep only useful parameters
-            useful_params = {}
-            keep_params = ['v', 'version', 'quality', 'format']
-            
-            for param, values in params.items():
-                if param in keep_params:
-                    useful_params[param] = values
-            
-            # Rebuild the URL without placeholder parameters
-            new_query = urlencode(useful_params, doseq=True)
-            fixed_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-            
-            if new_query:
-                fixed_url += f"?{new_query}"
-            
-            return fixed_url
-        
-        return url
-        
-    except Exception as e:
-        print(f"Error fixing URL {url}: {e}")
-        return url
-
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        retries=2
+    )
+    return httpx.AsyncClient(transport=transport, timeout=5.0, follow_redirects=True)
 
-def get_image_size(url):
+async def get_image_size(client, url):
     """Get image dimensions with timeout and error handling"""
     try:
         # Skip data URLs
         if url.startswith('data:'):
             return DEFAULT_IMAGE_SIZE
-            
-        # Set timeout to avoid blocking
-        response = requests.get(url, timeout=5, stream=True)
-        response.raise_for_status()
         
-        # Only download first few bytes to get dimensions
-        img_data = response.content[:1024]  # First 1KB should be enough for headers
+        # The URL already names the size - no request needed
+        match = _SIZE_IN_PATH_RE.search(url)
+        if match:
+            return {"width": int(match.group(1)), "height": int(match.group(2))}
+        
+        host = urlsplit(url).netloc
+        if _host_tripped(host):
+            return DEFAULT_IMAGE_SIZE
+        
+        etag = None
+        # Seen before: revalidate with a HEAD and reuse the size if the ETag still matches
+        cached = _HEAD_CACHE.get(url)
+        if cached:
+            head = await client.head(url)
+            if head.status_code == 200:
+                etag = head.headers.get('ETag')
+                if etag and etag == cached[0]:
+                    _record_host_success(host)
+                    return cached[1]
+        
+        # Read the start of the file until the header gives up the dimensions
+        buf = bytearray()
+        size = None
+        async with client.stream('GET', url, headers={'Range': PROBE_RANGE}) as response:
+            if response.status_code >= 500:
+                _record_host_failure(host)
+            response.raise_for_status()
+            etag = response.headers.get('ETag') or etag
+            async for chunk in response.aiter_bytes(1024):
+                buf += chunk
+                size = parse_image_size(buf)
+                if size:
+                    break
         
-        # Try to get image size without downloading entire file
-        img = Image.open(BytesIO(img_data))
-        return {"width": img.width, "height": img.height}
+        if size is None:
+            size = _parse_image_size_fallback(buf)
+        if etag:
+            _HEAD_CACHE[url] = (etag, size)
+        _record_host_success(host)
+        return size
+    except httpx.PoolTimeout as e:
+        # Waited for a free local connection; says nothing about the host
+        print(f"Could not get image size for {url}: {e}")
+        return DEFAULT_IMAGE_SIZE
+    except (httpx.TimeoutException, httpx.NetworkError) as e:
+        _record_host_failure(host)
+        print(f"Could not get image size for {url}: {e}")
+        return DEFAULT_IMAGE_SIZE
     except Exception as e:
         print(f"Could not get image size for {url}: {e}")
         return DEFAULT_IMAGE_SIZE
 
-def fix_product_images(product_images):
+async def fix_product_images(client, product_images):
     """Fix all image URLs in a product images array and get their sizes"""
     fixed_images = []
     image_sizes = []
     
-    # Use thread pool for concurrent image processing
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        # Process images concurrently
-        future_to_url = {
-            executor.submit(process_image, img_url): img_url 
-            for img_url in product_images
-        }
-        
-        for future in concurrent.futures.as_completed(future_to_url):
-            img_url = future_to_url[future]
-            try:
-                fixed_url, size = future.result()
-                if fixed_url:
-                    fixed_images.append(fixed_url)
-                    image_sizes.append(size)
-            except Exception as e:
-                print(f"Error processing image {img_url}: {e}")
+    # Bounded fan-out over the client's connection pool
+    results = await _process_images(client, product_images)
+    
+    for img_url, result in zip(product_images, results):
+        if isinstance(result, Exception):
+            print(f"Error processing image {img_url}: {result}")
+            continue
+        fixed_url, size = result
+        if fixed_url:
+            fixed_images.append(fixed_url)
+            image_sizes.append(size)
     
     return fixed_images, image_sizes
 
-def process_image(img_url):
-    """Process a single image URL"""
-    fixed_url = fix_image_url(img_url)
-    if fixed_url and not is_transparent_placeholder(fixed_url):
-        size = get_image_size(fixed_url)
-        return fixed_url, size
-    return None, None
-
-def is_transparent_placeholder(url):
+async def fix_product_images_unique(client, urls):
     """
-    Check if URL is a transparent SVG placeholder
+    Fix and probe each distinct image URL once
+    
+    CDN images are often shared between variant products, so duplicates are
+    collapsed before any request is made.
     
     Args:
-        url (str): Image URL
+        client (httpx.AsyncClient): Client used for the size probes
+        urls (iterable): Image URLs, possibly repeated
         
     Returns:
-        bool: True if it's a transparent placeholder
+        dict: Original URL -> (fixed_url, size) for every URL that is kept
     """
-    if not url or not url.startswith('data:image/svg+xml;base64,'):
-        return False
+    unique_urls = list(dict.fromkeys(urls))
+    processed = await _process_images(client, unique_urls)
     
-    try:
-        import base64
-        base64_data = url.split(',')[1]
-        decoded_svg = base64.b64decode(base64_data).decode('utf-8')
+    fixed_map = {}
+    for img_url, result in zip(unique_urls, processed):
+        if isinstance(result, Exception):
+            print(f"Error processing image {img_url}: {result}")
+            continue
+        if result[0]:
+            fixed_map[img_url] = result
+    return fixed_map
+
+async def fix_product_images_batch(client, image_lists):
+    """
+    Fix the image arrays of many products in one pass
+    
+    Every distinct URL across all products is probed once, then the results
+    are looked up per product (original order is preserved).
+    
+    Args:
+        client (httpx.AsyncClient): Client used for the size probes
+        image_lists (list): One list of image URLs per product
         
-        # Check if it's a transparent placeholder
-        return (
-            'fill="none"' in decoded_svg and 
-            'fill-opacity="0"' in decoded_svg and 
-            '99999' in decoded_svg
-        )
-    except:
-        return False
+    Returns:
+        list: One (fixed_images, image_sizes) tuple per input list
+    """
+    fixed_map = await fix_product_images_unique(client, itertools.chain.from_iterable(image_lists))
+    
+    results = []
+    for product_images in image_lists:
+        kept = [fixed_map[img_url] for img_url in product_images if img_url in fixed_map]
+        results.append(([fixed_url for fixed_url, _ in kept], [size for _, size in kept]))
+    return results
+
+async def _process_images(client, urls):
+    """process_image for every URL, at most PROBE_CONCURRENCY at a time (exceptions are returned)"""
+    semaphore = asyncio.Semaphore(PROBE_CONCURRENCY)
+    
+    async def limited(img_url):
+        async with semaphore:
+            return await process_image(client, img_url)
+    
+    return await asyncio.gather(*(limited(img_url) for img_url in urls), return_exceptions=True)
+
+async def process_image(client, img_url):
+    """Process a single image URL"""
+    fixed_url = fix_image_url(img_url)
+    if fixed_url and not is_transparent_placeholder(fixed_url):
+        size = await get_image_size(client, fixed_url)
+        return fixed_url, size
+    return None, None
 
 # Rest of the file remains the same...
\ No newline at end of file
@@ -8,6 +8,22 @@ from typing import List, Dict, Any, Optional
 from urllib.parse import urlparse
 import re
 
+# BeautifulSoup tree builder: libxml2 (C) when lxml is installed, else the pure-Python parser
+try:
+    import lxml  # noqa: F401
+    BS4_PARSER = "lxml"
+except ImportError:
+    BS4_PARSER = "html.parser"
+
+# Precompiled patterns applied to every monitored product page
+_PRICE_NUMBER_RE = re.compile(r'\d+[,.]?\d*')
+_DIGITS_RE = re.compile(r'\d+')
+_STOCK_INDICATOR_RE = re.compile(
+    r'(in stock|out of stock|sold out|available|unavailable|pre-order|backorder)',
+    re.IGNORECASE
+)
+_STOCK_COUNT_RE = re.compile(r'\d+ in stock', re.IGNORECASE)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -121,7 +137,7 @@ class PriceStockMonitor:
                 
                 # Parse with BeautifulSoup
                 from bs4 import BeautifulSoup
-                soup = BeautifulSoup(content, 'html.parser')
+                soup = BeautifulSoup(content, BS4_PARSER)
                 
                 # Extract product details
                 product_data = await self.parse_product_page(soup, url)
@@ -239,7 +255,7 @@ class PriceStockMonitor:
             return 0.0
         
         # Extract numbers with decimal points or commas
-        numbers = re.findall(r'\d+[,.]?\d*', text)
+        numbers = _PRICE_NUMBER_RE.findall(text)
         
         for num in numbers:
             # Clean and convert to float
@@ -280,10 +296,7 @@ class PriceStockMonitor:
     def extract_stock_status(self, soup) -> str:
         """Extract stock status"""
         # Look for stock indicators
-        stock_indicators = soup.find_all(text=re.compile(
-            r'(in stock|out of stock|sold out|available|unavailable|pre-order|backorder)',
-            re.IGNORECASE
-        ))
+        stock_indicators = soup.find_all(text=_STOCK_INDICATOR_RE)
         
         for indicator in stock_indicators:
             text = indicator.strip().lower()
@@ -329,9 +342,9 @@ class PriceStockMonitor:
                         pass
         
         # Try to parse from text
-        stock_text = soup.find_all(text=re.compile(r'\d+ in stock', re.IGNORECASE))
+        stock_text = soup.find_all(text=_STOCK_COUNT_RE)
         for text in stock_text:
-            numbers = re.findall(r'\d+', text)
+            numbers = _DIGITS_RE.findall(text)
             if numbers:
                 try:
                     return int(numbers[0])
@@ -450,16 +463,16 @@ class PriceStockMonitor:
         ]
         
         for selector in variant_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                if element.get('type') in ['radio', 'checkbox']:
-                    variant = {
-                        "name": element.get('name', ''),
-                        "value": element.get('value', ''),
-                        "price": self.parse_price_text(element.get('data-price', '')),
-                        "in_stock": not element.get('disabled') and not element.get('readonly')
-                    }
-                    variants.append(variant)
+            variants.extend(
+                {
+                    "name": element.get('name', ''),
+                    "value": element.get('value', ''),
+                    "price": self.parse_price_text(element.get('data-price', '')),
+                    "in_stock": not element.get('disabled') and not element.get('readonly')
+                }
+                for element in soup.select(selector)
+                if element.get('type') in ['radio', 'checkbox']
+            )
         
         return variants
     
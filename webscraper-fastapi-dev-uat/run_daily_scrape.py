@@ -1,11 +1,13 @@
 import asyncio
-import json
+import gzip
+import orjson
 import logging
 import pathlib
 import sys
 from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
-from scraper_simple_deep import scrape_urls_simple_api
+from scraper_simple_deep import scrape_urls_simple_stream, build_scrape_metadata
 
 # ----------------------------------------------------
 # Setup
@@ -21,6 +23,48 @@ cron_logs_dir.mkdir(parents=True, exist_ok=True)
 # Choose behavior: "latest" or "all"
 SCRAPE_MODE = "all"   # ✅ Always process all saved URLs, deduplicated
 
+# Query params that only track the visitor and never change the page
+_TRACKING_PARAMS = ("fbclid", "gclid")
+
+
+def _norm(u: str) -> str:
+    """Normalize a URL for deduplication: lower-case scheme/host, drop tracking params and trailing slash"""
+    parsed = urlparse(u.strip())
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.startswith("utm_") and key not in _TRACKING_PARAMS
+    ])
+    path = parsed.path.rstrip("/")
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, parsed.params, query, ""))
+
+
+async def scrape_to_file(urls, out_file, timestamp):
+    """
+    Scrape the URLs and stream the products into a gzipped JSON log
+    
+    Products are written as each URL finishes, so only one URL's products
+    are held in memory; the metadata block is appended at the end.
+    """
+    products_count = 0
+    total_pages_scraped = 0
+    unique_urls = 0
+
+    # Logs are full of repeated CDN prefixes, so they compress well; level 3 keeps it fast
+    with gzip.open(out_file, "wb", compresslevel=3) as f:
+        f.write(b'{"products":[')
+        async for chunk in scrape_urls_simple_stream(urls, max_pages=50):
+            blobs = [orjson.dumps(product, option=orjson.OPT_NON_STR_KEYS) for product in chunk["products"]]
+            if blobs:
+                await asyncio.to_thread(f.write, (b"," if products_count else b"") + b",".join(blobs))
+            products_count += len(blobs)
+            total_pages_scraped += chunk["pages_scraped"]
+            unique_urls += chunk["new_urls"]
+
+        metadata = build_scrape_metadata(timestamp, products_count, total_pages_scraped, len(urls), unique_urls)
+        f.write(b'],"metadata":' + orjson.dumps(metadata) + b'}')
+
+    return products_count
+
 
 def main():
     if not DATA_FILE.exists():
@@ -28,10 +72,10 @@ def main():
         sys.exit(1)
 
     # Load URLs from saved targets.json
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
+    with open(DATA_FILE, "rb") as f:
         try:
-            payload = json.load(f)
-        except json.JSONDecodeError:
+            payload = orjson.loads(f.read())
+        except orjson.JSONDecodeError:
             logger.error("Invalid JSON in targets file")
             sys.exit(1)
 
@@ -46,7 +90,11 @@ def main():
             all_urls = []
             for entry in payload:
                 all_urls.extend(entry.get("urls", []))
-            urls = list(dict.fromkeys(all_urls))  # deduplicate
+            # Deduplicate on the normalized form, keeping the first spelling seen
+            seen = {}
+            for url in all_urls:
+                seen.setdefault(_norm(url), url)
+            urls = list(seen.values())
     else:
         logger.error("Unsupported targets.json format")
         sys.exit(1)
@@ -56,25 +104,23 @@ def main():
         sys.exit(1)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_file = cron_logs_dir  / f"cron_scrape_{timestamp}.json"
+    out_file = cron_logs_dir  / f"cron_scrape_{timestamp}.json.gz"
 
     try:
         logger.info(f"Starting scrape for {len(urls)} urls")
-        result = asyncio.run(
-            asyncio.wait_for(scrape_urls_simple_api(urls, max_pages=50), timeout=3600)
+        products_count = asyncio.run(
+            asyncio.wait_for(scrape_to_file(urls, out_file, timestamp), timeout=3600)
         )
 
-        # Result already contains metadata + products
-        with open(out_file, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-
-        logger.info(f"Saved results to {out_file}")
+        logger.info(f"Saved {products_count} products to {out_file}")
         sys.exit(0)
     except asyncio.TimeoutError:
         logger.error("Scrape timed out after 3600s")
+        out_file.unlink(missing_ok=True)
         sys.exit(2)
     except Exception as e:
         logger.exception("Scrape failed")
+        out_file.unlink(missing_ok=True)
         sys.exit(3)
 
 
@@ -1,13 +1,16 @@
 import asyncio
 import json
 import os
+import re
 import logging
+import time
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import List, Dict, Any
 import aiohttp
 from scraper_simple_deep import SimpleProductScraper
 from scraper_ai_agent_deep import AIProductScraper
-from image_url_fixer import fix_product_images
+from image_url_fixer_deep import fix_product_images_batch, create_probe_client
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +23,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# URLs that are scraped as collections (paginated listings) rather than single products
+_COLLECTION_RE = re.compile(r"/(?:collection|category|shop)")
+
+RUN_INTERVAL_SECONDS = timedelta(days=10).total_seconds()
+
 class ScheduledScraper:
     def __init__(self, api_endpoint: str, api_key: str = None):
         self.api_endpoint = api_endpoint
@@ -39,34 +47,26 @@ class ScheduledScraper:
     
     def should_run(self) -> bool:
         """Check if it's time to run the scraper (every 10 days)"""
+        # The sentinel file's mtime is the last run time
         try:
-            if not os.path.exists(self.last_run_file):
-                return True
-                
-            with open(self.last_run_file, 'r') as f:
-                last_run_str = f.read().strip()
-                
-            if not last_run_str:
-                return True
-                
-            last_run = datetime.fromisoformat(last_run_str)
-            next_run = last_run + timedelta(days=10)
-            
-            if datetime.now() >= next_run:
-                return True
-            else:
-                logger.info(f"Next run scheduled for: {next_run}")
-                return False
-                
+            last_run = Path(self.last_run_file).stat().st_mtime
+        except FileNotFoundError:
+            return True
         except Exception as e:
             logger.error(f"Error checking last run: {e}")
             return True
+        
+        next_run = last_run + RUN_INTERVAL_SECONDS
+        if time.time() >= next_run:
+            return True
+        else:
+            logger.info(f"Next run scheduled for: {datetime.fromtimestamp(next_run)}")
+            return False
     
     def update_last_run(self):
         """Update the last run timestamp"""
         try:
-            with open(self.last_run_file, 'w') as f:
-                f.write(datetime.now().isoformat())
+            Path(self.last_run_file).touch()
             logger.info("Updated last run timestamp")
         except Exception as e:
             logger.error(f"Error updating last run: {e}")
@@ -83,20 +83,21 @@ class ScheduledScraper:
                 raise Exception("AI agent not available")
         except Exception as e:
             logger.warning(f"AI scraper failed, using simple scraper: {e}")
-            scraper = SimpleProductScraper()
             result = {"products": []}
             
-            for url in urls:
-                try:
-                    if "/collection" in url or "/category" in url or "/shop" in url:
-                        products = await scraper.scrape_collection_with_pagination(url, max_pages=20)
-                        result["products"].extend(products)
-                    else:
-                        product = await scraper.extract_product_data(url)
-                        if product and "error" not in product:
-                            result["products"].append(product)
-                except Exception as url_error:
-                    logger.error(f"Error scraping {url}: {url_error}")
+            # Closing the scraper releases the Chromium it launches on first use
+            async with SimpleProductScraper() as scraper:
+                for url in urls:
+                    try:
+                        if _COLLECTION_RE.search(url):
+                            products = await scraper.scrape_collection_with_pagination(url, max_pages=20)
+                            result["products"].extend(products)
+                        else:
+                            product = await scraper.extract_product_data(url)
+                            if product and "error" not in product:
+                                result["products"].append(product)
+                    except Exception as url_error:
+                        logger.error(f"Error scraping {url}: {url_error}")
         
         # Add metadata
         result["metadata"] = {
@@ -154,11 +155,14 @@ class ScheduledScraper:
         
         # Fix image URLs
         if "products" in scraped_data:
-            fixed_images, image_sizes = fix_product_images(
-                [img for product in scraped_data["products"] for img in product.get("product_images", [])]
-            )
-            # Update products with fixed images (this is a simplified approach)
-            # In a real implementation, you'd want to update each product individually
+            # Variant products often share CDN images, so each distinct URL is probed once
+            with_images = [product for product in scraped_data["products"] if "product_images" in product]
+            async with create_probe_client() as client:
+                batch_results = await fix_product_images_batch(client, [product["product_images"] for product in with_images])
+            
+            for product, (fixed, sizes) in zip(with_images, batch_results):
+                product["product_images"] = fixed
+                product["image_sizes"] = sizes
         
         # Send to API
         success = await self.send_to_api(scraped_data)
@@ -24,6 +24,8 @@ from bs4 import BeautifulSoup
 import google.generativeai as genai
 from dotenv import load_dotenv
 import aiohttp
+import httpx
+from scraper_simple_deep import SharedBrowser
 # Load environment variables
 load_dotenv()
 
@@ -138,21 +140,16 @@ class AIProductScraper:
     async def _fetch_page_content(self, url: str) -> Optional[str]:
         """Fetch page content with timeout handling"""
         try:
+            if self.browser is not None:
+                async with self.browser.page() as page:
+                    return await self._load_page_content(page, url)
+            
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=True)
                 page = await browser.new_page()
                 
                 try:
-                    await page.goto(url, wait_until="domcontentloaded", timeout=25000)
-                    
-                    try:
-                        await page.wait_for_load_state("networkidle", timeout=5000)
-                    except:
-                        pass  # Continue anyway
-                    
-                    await asyncio.sleep(2)
-                    return await page.content()
-                    
+                    return await self._load_page_content(page, url)
                 finally:
                     await browser.close()
                     
@@ -160,11 +157,30 @@ class AIProductScraper:
             # Try HTTP fallback
             return await self._fetch_with_http_fallback(url)
 
+    async def _load_page_content(self, page, url: str) -> str:
+        """Navigate an open page to the URL and return its rendered HTML"""
+        await page.goto(url, wait_until="domcontentloaded", timeout=25000)
+        
+        try:
+            await page.wait_for_load_state("networkidle", timeout=5000)
+        except:
+            pass  # Continue anyway
+        
+        await asyncio.sleep(2)
+        return await page.content()
+
     async def _fetch_with_http_fallback(self, url: str) -> Optional[str]:
         """HTTP fallback when Playwright fails"""
         try:
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
             
+            if self.http_client is not None:
+                # The shared client doesn't follow redirects by default; aiohttp did
+                response = await self.http_client.get(url, headers=headers, timeout=20, follow_redirects=True)
+                if response.status_code == 200:
+                    return response.text
+                return None
+            
             async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20)) as session:
                 async with session.get(url, headers=headers) as response:
                     if response.status == 200:
@@ -174,10 +190,16 @@ class AIProductScraper:
         
         return None
     # In scraper_ai_agent.py, update the __init__ method of AIProductScraper
-    def __init__(self, log_callback: Optional[Callable] = None, progress_callback: Optional[Callable] = None):
+    def __init__(self, log_callback: Optional[Callable] = None, progress_callback: Optional[Callable] = None,
+                 http_client: Optional[httpx.AsyncClient] = None,
+                 browser: Optional[SharedBrowser] = None):
         self.log_callback = log_callback
         self.progress_callback = progress_callback
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Shared pooled client (owned by the caller) used for the HTTP fallback
+        self.http_client = http_client
+        # Shared Chromium (owned by the caller); without one each fetch launches its own
+        self.browser = browser
         
         # Initialize AI agent with better error handling
         self.ai_agent = None
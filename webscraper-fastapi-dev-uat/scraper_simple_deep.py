@@ -4,30 +4,164 @@ Universal extraction that works with ALL e-commerce websites
 """
 
 import asyncio
+import concurrent.futures
+import functools
 import json
 import logging
 import os
+import threading
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Callable
-from urllib.parse import urljoin, urlparse
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator, Union, Tuple
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
 import re
 import tenacity
 import traceback2 as traceback
 
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, Browser, Page, Playwright
 from pydantic import HttpUrl
 from bs4 import BeautifulSoup
+import soupsieve
 import httpx
 import re
 import json
+import orjson
+import xxhash
+from cachetools import LRUCache
 from selectolax.parser import HTMLParser
 
+# BeautifulSoup tree builder: libxml2 (C) when lxml is installed, else the pure-Python parser
+try:
+    import lxml  # noqa: F401
+    BS4_PARSER = "lxml"
+except ImportError:
+    BS4_PARSER = "html.parser"
+
+# Recently parsed pages, keyed by a hash of the HTML. The extraction methods of one
+# product run back to back on the same page, so a handful of entries is enough.
+_SOUP_CACHE: LRUCache = LRUCache(maxsize=4)
+_SOUP_CACHE_LOCK = threading.Lock()
+# Subtrees no extractor queries (script/style text and comments are already skipped by
+# get_text, inline SVG icons only add nodes); cut out before parsing so they are never built
+# into the tree. One left-to-right pass, so a "<script>" inside a comment (or vice versa) is
+# treated the way the HTML parser would. A self-closing <svg .../> has no body to cut (its
+# '/>' is honoured, unlike on <script/>/<style/>, which the parser still treats as openings).
+_UNQUERIED_BLOCK_RE = re.compile(
+    r'<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>|<svg\b[^>]*(?<!/)>.*?</svg\s*>',
+    re.DOTALL | re.IGNORECASE
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns applied to every fetched page / price string
+_JSONLD_SCRIPT_RE = re.compile(
+    r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE
+)
+# Assignments that are followed by an inline product object; the object itself is read
+# with _JSON_DECODER.raw_decode, which consumes exactly one (arbitrarily nested) value
+_JS_PRODUCT_PATTERNS = [
+    re.compile(r'window\.product\s*=\s*(?={)'),
+    re.compile(r'var\s+product\s*=\s*(?={)'),
+    re.compile(r'window\.productData\s*=\s*(?={)'),
+    re.compile(r'dataLayer\.push\(\s*(?={[^;]*?"ecommerce")'),
+    re.compile(r'"product"\s*:\s*(?={)'),
+]
+_JSON_DECODER = json.JSONDecoder()
+_CURRENCY_WORDS_RE = re.compile(r'\b(rupees?|dollars?|euros?|pounds?)\b', re.IGNORECASE)
+_NON_PRICE_CHARS_RE = re.compile(r'[^\d.,\s]')
+# Rupee sign, 'Rs' in any case, or a digit: one scan instead of lower() plus a per-char loop
+_PRICE_TEXT_HINT_RE = re.compile(r'₹|[rR][sS]|\d')
+_DIGITS_RE = re.compile(r'\d+')
+_TEXT_PRICE_PATTERNS = [
+    re.compile(r'₹\s*(\d+(?:[,.]?\d+)*)', re.IGNORECASE),  # Indian Rupee
+    re.compile(r'\$\s*(\d+(?:[,.]?\d+)*)', re.IGNORECASE),  # Dollar
+    re.compile(r'€\s*(\d+(?:[,.]?\d+)*)', re.IGNORECASE),   # Euro
+    re.compile(r'£\s*(\d+(?:[,.]?\d+)*)', re.IGNORECASE),   # Pound
+    re.compile(r'(\d+(?:[,.]?\d+)*)\s*(?:rs|rupees|dollars|euros|pounds)', re.IGNORECASE),  # Word-based
+    re.compile(r'price[:\s]*(\d+(?:[,.]?\d+)*)', re.IGNORECASE),  # Price: 123
+    re.compile(r'cost[:\s]*(\d+(?:[,.]?\d+)*)', re.IGNORECASE),   # Cost: 123
+]
+_PAGE_PARAM_RE = re.compile(r'page=\d+')
+_PAGE_PATH_RE = re.compile(r'/page/\d+')
+_P_PARAM_RE = re.compile(r'p=\d+')
+# is_collection_url rules, matched against the lower-cased URL
+_COLLECTION_PATH_RE = re.compile('|'.join(re.escape(pattern) for pattern in [
+    '/collections/', '/collection/', '/category/', '/categories/',
+    '/product-category/', '/shop/', '/store/', '/browse/',
+    '/all-products/', '/products', '/items/', '/catalog/',
+    '/c/', '/cat/', '/department/', '/section/', '/tags/',
+    '/brand/', '/brands/', '/search', '/filter'
+]))
+_SINGLE_PRODUCT_PATH_RE = re.compile(r'/(?:product|item|p)/')
+_LISTING_KEYWORD_RE = re.compile(r'shop|store|product|item|collection')
+_LISTING_QUERY_RE = re.compile(r'category|collection|type|filter|tag|brand')
+# Storefront markers present in the HTML of every Shopify shop, custom domain or not
+_SHOPIFY_MARKER_RE = re.compile(r'cdn\.shopify\.com|Shopify\.shop\b|shopify-digest')
+
+
+@functools.lru_cache(maxsize=1024)
+def _host_lower(url: str) -> str:
+    """Lower-cased host of a URL, memoized for the page URLs every candidate link is compared to"""
+    return urlparse(url).netloc.lower()
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_product_url(href: str, base_url: str) -> bool:
+    """Same-domain product link check, memoized: nav, footer and related-product links recur on every page"""
+    # Cheap rejections first: missing/relative or unreasonably long URLs
+    if not href or not href.startswith('http') or len(href) > 500:
+        return False
+    
+    href_lower = href.lower()
+    base_domain = _host_lower(base_url)
+    url_domain = urlparse(href_lower).netloc
+    
+    # Must be from same domain
+    if base_domain not in url_domain and url_domain not in base_domain:
+        return False
+    
+    # Should contain product indicators and NOT contain exclusion patterns
+    return (_PRODUCT_URL_INDICATOR_RE.search(href_lower) is not None
+            and _PRODUCT_URL_EXCLUSION_RE.search(href_lower) is None)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_selectors(selectors: Tuple[str, ...]) -> Tuple[soupsieve.SoupSieve, ...]:
+    """Compile a selector list once; selectors soupsieve rejects are dropped here, not per page"""
+    compiled = []
+    for selector in selectors:
+        try:
+            compiled.append(soupsieve.compile(selector))
+        except soupsieve.SelectorSyntaxError:
+            continue
+    return tuple(compiled)
+
+
+def _keyword_re(keywords: List[str]) -> re.Pattern:
+    """One alternation over literal keywords: a single scan instead of one `in` per keyword"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+
+# Keyword lists matched against lower-cased URLs / text, once per link, image or element
+_PRODUCT_URL_INDICATOR_RE = _keyword_re(['/product/', '/products/', '/item/', '/p/'])
+_PRODUCT_URL_EXCLUSION_RE = _keyword_re([
+    '/cart', '/checkout', '/account', '/login', '/register',
+    '/search', '/contact', '/about', '/policy', '/terms',
+    '/collections/', '/category/', '/shop', '.js', '.css',
+    '.jpg', '.png', '.gif', '.pdf', 'javascript:', 'mailto:'
+])
+_NON_PRODUCT_IMAGE_RE = _keyword_re([
+    'logo', 'banner', 'icon', 'arrow', 'button', 'bg', 'background',
+    'social', 'payment', 'shipping', 'footer', 'header', 'nav'
+])
+_CHROME_CONTAINER_RE = _keyword_re(['nav', 'menu', 'footer', 'header', 'sidebar', 'breadcrumb'])
+_BOILERPLATE_TEXT_RE = _keyword_re(['click here', 'read more', 'terms', 'privacy', 'cookie'])
+_PRODUCT_HEADING_CLASS_RE = _keyword_re(['product', 'item', 'title', 'name'])
+_CURRENCY_SYMBOL_RE = _keyword_re(['₹', '$', '€', '£', '¥', '¢', '₨', '₩', '₪', 'Rs', 'rs', 'INR', 'inr'])
+
 class UniversalProductScraper:
     """Enhanced universal scraper that works with any e-commerce site"""
     
@@ -71,14 +205,113 @@ class UniversalProductScraper:
             ]
         }
 
+class SharedBrowser:
+    """
+    One lazily launched Chromium shared by many page fetches
+    
+    Each fetch gets its own BrowserContext (isolated cookies/storage) instead of
+    paying for a full browser launch; a semaphore caps concurrently open contexts.
+    """
+    
+    def __init__(self, max_contexts: int = 4):
+        self._semaphore = asyncio.Semaphore(max_contexts)
+        self._launch_lock = asyncio.Lock()
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+
+    async def _get_browser(self) -> Browser:
+        """Launch Chromium on first use (and again if it has crashed or been closed)"""
+        async with self._launch_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+            return self._browser
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """A fresh page in its own context, closed on exit"""
+        async with self._semaphore:
+            browser = await self._get_browser()
+            context = await browser.new_context()
+            try:
+                yield await context.new_page()
+            finally:
+                await context.close()
+
+    async def aclose(self):
+        """Close the browser and stop Playwright (safe to call when nothing was launched)"""
+        async with self._launch_lock:
+            if self._browser is not None:
+                await self._browser.close()
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
 class SimpleProductScraper:
     """Enhanced simple product scraper using direct HTML parsing with universal support"""
     
-    def __init__(self, log_callback: Optional[Callable] = None, progress_callback: Optional[Callable] = None):
+    def __init__(self, log_callback: Optional[Callable] = None, progress_callback: Optional[Callable] = None,
+                 http_client: Optional[httpx.AsyncClient] = None,
+                 parse_pool: Optional[concurrent.futures.Executor] = None,
+                 browser: Optional[SharedBrowser] = None):
         self.log_callback = log_callback
         self.progress_callback = progress_callback
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.universal_scraper = UniversalProductScraper()
+        # Shared pooled client (owned by the caller); falls back to a one-off client per request
+        self.http_client = http_client
+        # Optional process pool (owned by the caller) for the CPU-bound HTML parsers
+        self.parse_pool = parse_pool
+        # Shared Chromium (owned by the caller); otherwise one is launched on first use and
+        # released by aclose()
+        self.browser = browser
+        self._owns_browser = browser is None
+        # Hosts whose pages carried Shopify markers: later products go straight to the JSON API
+        self._shopify_hosts = set()
+
+    async def _http_get(self, url: str, timeout: float, **kwargs) -> httpx.Response:
+        """GET through the shared client when available, otherwise through a short-lived one"""
+        if self.http_client is not None:
+            return await self.http_client.get(url, timeout=timeout, **kwargs)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            return await client.get(url, **kwargs)
+
+    def _browser_page(self):
+        """Context manager yielding a page from the shared browser"""
+        if self.browser is None:
+            self.browser = SharedBrowser()
+        return self.browser.page()
+
+    async def aclose(self):
+        """Release the browser this scraper launched itself (a caller-owned one is left open)"""
+        if self._owns_browser and self.browser is not None:
+            await self.browser.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _parse_html(self, method_name: str, *args):
+        """Run a pure HTML parser in the parse pool when available, otherwise in a worker thread"""
+        if self.parse_pool is None:
+            return await asyncio.to_thread(getattr(self, method_name), *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_pool, _parse_in_worker, method_name, *args)
+
+    def _parse(self, html: str) -> BeautifulSoup:
+        """Parse a page once and share the tree with every extractor that sees the same HTML"""
+        key = xxhash.xxh3_64_intdigest(html.encode())
+        with _SOUP_CACHE_LOCK:
+            soup = _SOUP_CACHE.get(key)
+        if soup is None:
+            soup = BeautifulSoup(_UNQUERIED_BLOCK_RE.sub('', html), BS4_PARSER)
+            with _SOUP_CACHE_LOCK:
+                _SOUP_CACHE[key] = soup
+        return soup
         # ---------------- STOCK HELPERS ----------------
     def _extract_stock_from_jsonld(self, offers: dict) -> Optional[str]:
         """Extract stock availability from JSON-LD offers"""
@@ -215,14 +448,14 @@ class SimpleProductScraper:
                 '.price .woocommerce-Price-amount.amount bdi'
             ]
             
-            # Wait for any price element to appear
-            for selector in price_selectors:
-                try:
-                    await page.wait_for_selector(selector, timeout=10000)  # 10s max per selector
-                    self.log(f"✅ Price element found with selector: {selector}")
-                    return True
-                except Exception as e:
-                    continue
+            # Wait for any price element to appear: one union selector, so the page is
+            # polled once per tick instead of waiting out each selector in turn
+            try:
+                await page.wait_for_selector(', '.join(price_selectors), timeout=10000)
+                self.log("✅ Price element found")
+                return True
+            except Exception as e:
+                pass
             
             # Fallback: Wait for any element containing currency symbols
             try:
@@ -276,7 +509,7 @@ class SimpleProductScraper:
         """Try platform-specific APIs (Shopify, WooCommerce)"""
         platform = self._get_platform(url)
         
-        if platform == 'shopify':
+        if platform == 'shopify' or _host_lower(url) in self._shopify_hosts:
             return await self._extract_shopify_api(url)
         elif platform == 'woocommerce':
             return await self._extract_woocommerce_api(url)
@@ -286,24 +519,27 @@ class SimpleProductScraper:
     async def _extract_shopify_api(self, url: str) -> Optional[Dict[str, Any]]:
         """Extract from Shopify product JSON API"""
         try:
-            # Convert product URL to JSON API endpoint
-            if '/products/' in url:
-                json_url = url.replace('/products/', '/products/').rstrip('/') + '.js'
+            # Convert product URL to JSON API endpoint (/products/<handle>.js, query dropped)
+            parts = urlsplit(url)
+            if '/products/' in parts.path:
+                json_url = urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip('/') + '.js', '', ''))
             else:
                 return None
             
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(json_url)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    return {
-                        "product_name": data.get('title', ''),
-                        "price": float(data.get('price', 0)) / 100 if data.get('price') else 0.0,
-                        "product_images": data.get('images', []),
-                        "description": data.get('description', '') or data.get('body_html', ''),
-                        "extraction_method": "shopify_api"
-                    }
+            response = await self._http_get(json_url, timeout=10)
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                
+                return {
+                    "product_name": data.get('title', ''),
+                    "price": float(data.get('price', 0)) / 100 if data.get('price') else 0.0,
+                    # Shopify serves protocol-relative CDN URLs
+                    "product_images": ['https:' + img if img.startswith('//') else img
+                                       for img in data.get('images', [])],
+                    "description": data.get('description', '') or data.get('body_html', ''),
+                    "extraction_method": "shopify_api",
+                    "in_stock": "InStock" if data.get('available') else "OutOfStock",
+                }
         except Exception as e:
             self.log(f"Shopify API extraction failed: {e}", "DEBUG")
         return None
@@ -326,48 +562,58 @@ class SimpleProductScraper:
     async def _extract_using_structured_data(self, url: str) -> Optional[Dict[str, Any]]:
         """Extract from JSON-LD, microdata, and JavaScript variables"""
         try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                response = await client.get(url, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
-                
-                if response.status_code != 200:
-                    return None
-                
-                html = response.text
-                
-                # Try JSON-LD first
-                jsonld_data = self._parse_jsonld(html)
-                if jsonld_data:
-                    jsonld_data["extraction_method"] = "jsonld_structured_data"
-                    return jsonld_data
-                
-                # Try JavaScript variables
-                js_data = self._parse_js_variables(html)
-                if js_data:
-                    js_data["extraction_method"] = "javascript_variables"
-                    return js_data
-                
-                # Try meta tags as fallback
-                meta_data = self._parse_meta_tags(html)
-                if meta_data:
-                    meta_data["extraction_method"] = "meta_tags"
-                    return meta_data
-                
+            response = await self._http_get(url, timeout=15, headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+            
+            if response.status_code != 200:
+                return None
+            
+            # A Shopify store on its own domain: its product JSON is exact, use it instead of
+            # parsing (and remember the host so its other products skip the HTML fetch)
+            if _SHOPIFY_MARKER_RE.search(response.text):
+                self._shopify_hosts.add(_host_lower(url))
+                shopify_data = await self._extract_shopify_api(url)
+                if shopify_data:
+                    return shopify_data
+            
+            return await self._parse_html("_parse_structured_html", response.text)
+            
         except Exception as e:
             self.log(f"Structured data extraction failed: {e}", "DEBUG")
         
         return None
     
+    def _parse_structured_html(self, html: str) -> Optional[Dict[str, Any]]:
+        """Try JSON-LD, then JavaScript variables, then meta tags on a fetched page"""
+        # Try JSON-LD first
+        jsonld_data = self._parse_jsonld(html)
+        if jsonld_data:
+            jsonld_data["extraction_method"] = "jsonld_structured_data"
+            return jsonld_data
+        
+        # Try JavaScript variables
+        js_data = self._parse_js_variables(html)
+        if js_data:
+            js_data["extraction_method"] = "javascript_variables"
+            return js_data
+        
+        # Try meta tags as fallback
+        meta_data = self._parse_meta_tags(html)
+        if meta_data:
+            meta_data["extraction_method"] = "meta_tags"
+            return meta_data
+        
+        return None
+    
     def _parse_jsonld(self, html: str) -> Optional[Dict[str, Any]]:
         """Parse JSON-LD structured data"""
         # Find all JSON-LD script tags
-        pattern = r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>'
-        matches = re.findall(pattern, html, re.DOTALL | re.IGNORECASE)
+        matches = _JSONLD_SCRIPT_RE.findall(html)
         
         for match in matches:
             try:
-                data = json.loads(match.strip())
+                data = orjson.loads(match.strip())
                 
                 # Handle arrays
                 if isinstance(data, list):
@@ -434,38 +680,23 @@ class SimpleProductScraper:
     async def _extract_using_browser_extended(self, url: str) -> Optional[Dict[str, Any]]:
         """Extended browser extraction with longer waits and price-specific retries"""
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
+            async with self._browser_page() as page:
+                # Longer timeouts for difficult pages
+                page.set_default_timeout(45000)  # 45 seconds
+                page.set_default_navigation_timeout(45000)
                 
-                try:
-                    # Longer timeouts for difficult pages
-                    page.set_default_timeout(45000)  # 45 seconds
-                    page.set_default_navigation_timeout(45000)
-                    
-                    # Navigate and wait for load
-                    await page.goto(url, wait_until="networkidle", timeout=45000)
-                    
-                    # Multiple strategies to ensure prices are loaded
-                    price_found = await self._wait_for_price_with_retry(page)
-                    
-                    # Final content extraction
-                    content = await page.content()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    result = {
-                        "product_name": self._extract_product_name_universal(soup),
-                        "price": self._extract_price_universal(soup),
-                        "product_images": self._extract_images_universal(soup, url),
-                        "description": self._extract_description_universal(soup),
-                        "extraction_method": "browser_extended",
-                        "in_stock": self._extract_stock_from_html(soup),
-                    }
-                    
-                    return result
-                    
-                finally:
-                    await browser.close()
+                # Navigate and wait for load
+                await page.goto(url, wait_until="networkidle", timeout=45000)
+                
+                # Multiple strategies to ensure prices are loaded
+                price_found = await self._wait_for_price_with_retry(page)
+                
+                # Final content extraction
+                content = await page.content()
+                result = await self._parse_html("_parse_static_html", content, url)
+                result["extraction_method"] = "browser_extended"
+                
+                return result
         except Exception as e:
             self.log(f"Extended browser extraction failed: {e}", "DEBUG")
             return None
@@ -496,19 +727,10 @@ class SimpleProductScraper:
     def _parse_js_variables(self, html: str) -> Optional[Dict[str, Any]]:
         """Parse JavaScript variables containing product data"""
         # Common JavaScript variable patterns
-        patterns = [
-            r'window\.product\s*=\s*({.*?});',
-            r'var\s+product\s*=\s*({.*?});',
-            r'window\.productData\s*=\s*({.*?});',
-            r'dataLayer\.push\(\s*({.*?"ecommerce".*?})\s*\);',
-            r'"product"\s*:\s*({.*?})',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, html, re.DOTALL)
-            for match in matches:
+        for pattern in _JS_PRODUCT_PATTERNS:
+            for match in pattern.finditer(html):
                 try:
-                    data = json.loads(match)
+                    data, _ = _JSON_DECODER.raw_decode(html, match.end())
                     
                     # Handle different data structures
                     product_data = None
@@ -586,39 +808,39 @@ class SimpleProductScraper:
 
     def _parse_meta_tags(self, html: str) -> Optional[Dict[str, Any]]:
         """Parse meta tags for product information"""
-        soup = BeautifulSoup(html, 'html.parser')
+        tree = HTMLParser(html)
         
         # Extract from Open Graph tags
-        og_title = soup.find('meta', property='og:title')
-        og_price = soup.find('meta', property='product:price:amount')
-        og_image = soup.find('meta', property='og:image')
-        og_description = soup.find('meta', property='og:description')
+        og_title = tree.css_first('meta[property="og:title"]')
+        og_price = tree.css_first('meta[property="product:price:amount"]')
+        og_image = tree.css_first('meta[property="og:image"]')
+        og_description = tree.css_first('meta[property="og:description"]')
         
         # Extract from standard meta tags
-        meta_title = soup.find('meta', {'name': 'title'})
-        meta_description = soup.find('meta', {'name': 'description'})
+        meta_title = tree.css_first('meta[name="title"]')
+        meta_description = tree.css_first('meta[name="description"]')
         
         # Build result
         result = {}
         
         if og_title:
-            result['product_name'] = og_title.get('content', '')
+            result['product_name'] = og_title.attributes.get('content') or ''
         elif meta_title:
-            result['product_name'] = meta_title.get('content', '')
+            result['product_name'] = meta_title.attributes.get('content') or ''
         
         if og_price:
             try:
-                result['price'] = float(og_price.get('content', 0))
+                result['price'] = float(og_price.attributes.get('content') or 0)
             except ValueError:
                 result['price'] = 0.0
         
         if og_image:
-            result['product_images'] = [og_image.get('content', '')]
+            result['product_images'] = [og_image.attributes.get('content') or '']
         
         if og_description:
-            result['description'] = og_description.get('content', '')
+            result['description'] = og_description.attributes.get('content') or ''
         elif meta_description:
-            result['description'] = meta_description.get('content', '')
+            result['description'] = meta_description.attributes.get('content') or ''
         
         # Only return if we found meaningful data
         if result.get('product_name') and result.get('product_name') != 'Unknown Product':
@@ -683,7 +905,7 @@ class SimpleProductScraper:
                     raw_text = element.get_text(strip=True)
                     self.log(f"DEBUG: Fallback element {j+1} text: '{raw_text}'")
                     
-                    if raw_text and ('₹' in raw_text or 'rs' in raw_text.lower() or any(c.isdigit() for c in raw_text)):
+                    if raw_text and _PRICE_TEXT_HINT_RE.search(raw_text):
                         price = self._parse_price_universal(raw_text)
                         self.log(f"DEBUG: Fallback parsed price: {price}")
                         
@@ -700,27 +922,31 @@ class SimpleProductScraper:
     async def _extract_using_static_html(self, url: str) -> Optional[Dict[str, Any]]:
         """Extract from static HTML using universal selectors"""
         try:
-            async with httpx.AsyncClient(timeout=12) as client:
-                response = await client.get(url, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    return {
-                        "product_name": self._extract_product_name_universal(soup),
-                        "price": self._extract_price_universal(soup),
-                        "product_images": self._extract_images_universal(soup, url),
-                        "description": self._extract_description_universal(soup),
-                        "extraction_method": "static_html_parsing",
-                        "in_stock": self._extract_stock_from_html(soup),
-                    }
+            response = await self._http_get(url, timeout=12, headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+            
+            if response.status_code == 200:
+                return await self._parse_html("_parse_static_html", response.text, url)
         except Exception as e:
             self.log(f"Static HTML extraction failed: {e}", "DEBUG")
         
         return None
     
+    def _parse_static_html(self, html: str, url: str) -> Dict[str, Any]:
+        """Extract product fields from a fetched page using universal selectors"""
+        soup = self._parse(html)
+        
+        return {
+            "product_name": self._extract_product_name_universal(soup),
+            "price": self._extract_price_universal(soup),
+            # selectolax runs the image selectors in C, well under the cost of soupsieve
+            "product_images": self._extract_images_universal(HTMLParser(html), url),
+            "description": self._extract_description_universal(soup),
+            "extraction_method": "static_html_parsing",
+            "in_stock": self._extract_stock_from_html(soup),
+        }
+    
     def _extract_product_name_universal(self, soup: BeautifulSoup) -> str:
         """Extract product name using universal selectors"""
         for selector in self.universal_scraper.universal_selectors['product_name']:
@@ -783,22 +1009,18 @@ class SimpleProductScraper:
         
         self.log(f"DEBUG: Parsing price text: '{price_text}'")
         
-        import re
-        
         # Step 1: Remove currency symbols and clean
         # Handle Indian Rupee symbol specifically
         cleaned = price_text
         
         # Remove various currency symbols
-        currency_symbols = ['₹', '$', '€', '£', '¥', '¢', '₨', '₩', '₪', 'Rs', 'rs', 'INR', 'inr']
-        for symbol in currency_symbols:
-            cleaned = cleaned.replace(symbol, '')
+        cleaned = _CURRENCY_SYMBOL_RE.sub('', cleaned)
         
         # Remove currency words
-        cleaned = re.sub(r'\b(rupees?|dollars?|euros?|pounds?)\b', '', cleaned, flags=re.IGNORECASE)
+        cleaned = _CURRENCY_WORDS_RE.sub('', cleaned)
         
         # Keep only digits, dots, commas, and spaces
-        cleaned = re.sub(r'[^\d.,\s]', '', cleaned)
+        cleaned = _NON_PRICE_CHARS_RE.sub('', cleaned)
         cleaned = cleaned.strip()
         
         self.log(f"DEBUG: After cleaning: '{cleaned}'")
@@ -847,7 +1069,7 @@ class SimpleProductScraper:
             self.log(f"DEBUG: Float conversion failed: {e}")
             
             # Last resort: extract first sequence of digits
-            digits = re.findall(r'\d+', cleaned)
+            digits = _DIGITS_RE.findall(cleaned)
             if digits:
                 try:
                     result = float(digits[0])
@@ -858,14 +1080,19 @@ class SimpleProductScraper:
             
             self.log(f"DEBUG: All parsing attempts failed")
             return 0.0
-    def _extract_images_universal(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Extract product images using universal selectors"""
+    def _extract_images_universal(self, tree: Union[HTMLParser, BeautifulSoup], base_url: str) -> List[str]:
+        """Extract product images using universal selectors (selectolax tree or BeautifulSoup)"""
         images = []
+        seen = set()
+        if isinstance(tree, BeautifulSoup):
+            select, get = tree.select, lambda element, name: element.get(name)
+        else:
+            select, get = tree.css, lambda element, name: element.attributes.get(name)
         
         for selector in self.universal_scraper.universal_selectors['images']:
-            elements = soup.select(selector)
+            elements = select(selector)
             for img in elements:
-                src = img.get('src') or img.get('data-src') or img.get('data-lazy-src') or img.get('data-large_image')
+                src = get(img, 'src') or get(img, 'data-src') or get(img, 'data-lazy-src') or get(img, 'data-large_image')
                 if src:
                     # Convert relative URLs to absolute
                     if src.startswith('//'):
@@ -873,7 +1100,8 @@ class SimpleProductScraper:
                     elif src.startswith('/'):
                         src = urljoin(base_url, src)
                     
-                    if src not in images and src.startswith('http'):
+                    if src not in seen and src.startswith('http'):
+                        seen.add(src)
                         images.append(src)
         
         return images[:20]  # Limit to 20 images
@@ -897,47 +1125,34 @@ class SimpleProductScraper:
     async def _extract_using_browser(self, url: str, timeout_seconds: int) -> Optional[Dict[str, Any]]:
         """Browser extraction with price-specific waiting"""
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
+            async with self._browser_page() as page:
+                # Set timeouts
+                page.set_default_timeout(timeout_seconds * 1000)
+                page.set_default_navigation_timeout(timeout_seconds * 1000)
                 
-                try:
-                    # Set timeouts
-                    page.set_default_timeout(timeout_seconds * 1000)
-                    page.set_default_navigation_timeout(timeout_seconds * 1000)
-                    
-                    # Load page
-                    await page.goto(url, wait_until="domcontentloaded", timeout=timeout_seconds * 1000)
-                    
-                    # Wait specifically for price elements to load
-                    price_found = await self._wait_for_price_elements(page, timeout_seconds)
-                    
-                    if not price_found:
-                        # If no price found, wait for network to be idle
-                        try:
-                            await page.wait_for_load_state("networkidle", timeout=5000)
-                        except:
-                            pass
-                    
-                    # Additional wait for dynamic content
-                    await asyncio.sleep(2)
-                    
-                    # Get content and parse
-                    content = await page.content()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    return {
-                        "product_name": self._extract_product_name_universal(soup),
-                        "price": self._extract_price_universal(soup),
-                        "product_images": self._extract_images_universal(soup, url),
-                        "description": self._extract_description_universal(soup),
-                        "extraction_method": f"browser_{timeout_seconds}s_timeout",
-                        "in_stock": self._extract_stock_from_html(soup),
-                        "price_wait_successful": price_found  # Debug info
-                    }
-                    
-                finally:
-                    await browser.close()
+                # Load page
+                await page.goto(url, wait_until="domcontentloaded", timeout=timeout_seconds * 1000)
+                
+                # Wait specifically for price elements to load
+                price_found = await self._wait_for_price_elements(page, timeout_seconds)
+                
+                if not price_found:
+                    # If no price found, wait for network to be idle
+                    try:
+                        await page.wait_for_load_state("networkidle", timeout=5000)
+                    except:
+                        pass
+                
+                # Additional wait for dynamic content
+                await asyncio.sleep(2)
+                
+                # Get content and parse
+                content = await page.content()
+                result = await self._parse_html("_parse_static_html", content, url)
+                result["extraction_method"] = f"browser_{timeout_seconds}s_timeout"
+                result["price_wait_successful"] = price_found  # Debug info
+                
+                return result
         except Exception as e:
             self.log(f"Browser extraction with {timeout_seconds}s failed: {e}", "DEBUG")
             return None
@@ -947,39 +1162,42 @@ class SimpleProductScraper:
         Uses the most generic selectors and techniques
         """
         try:
-            async with httpx.AsyncClient(timeout=20) as client:
-                response = await client.get(url, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Connection': 'keep-alive',
-                })
-                
-                if response.status_code != 200:
-                    return None
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract using most universal methods possible
-                product_name = self._extract_name_universal_fallback(soup)
-                price = self._extract_price_universal_fallback(soup)
-                images = self._extract_images_universal_fallback(soup, url)
-                description = self._extract_description_universal_fallback(soup)
-                
-                return {
-                    "product_name": product_name,
-                    "price": price,
-                    "product_images": images,
-                    "description": description,
-                    "extraction_method": "universal_fallback",
-                    "in_stock": self._extract_stock_from_html(soup),
-
-                }
-                
+            response = await self._http_get(url, timeout=20, headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.5',
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive',
+            })
+            
+            if response.status_code != 200:
+                return None
+            
+            return await self._parse_html("_parse_universal_fallback", response.text, url)
+            
         except Exception as e:
             self.log(f"Universal fallback failed: {e}", "ERROR")
             return None
+    
+    def _parse_universal_fallback(self, html: str, url: str) -> Dict[str, Any]:
+        """Extract product fields from a fetched page using the most generic techniques"""
+        soup = self._parse(html)
+        
+        # Extract using most universal methods possible
+        product_name = self._extract_name_universal_fallback(soup)
+        price = self._extract_price_universal_fallback(soup)
+        images = self._extract_images_universal_fallback(soup, url)
+        description = self._extract_description_universal_fallback(soup)
+        
+        return {
+            "product_name": product_name,
+            "price": price,
+            "product_images": images,
+            "description": description,
+            "extraction_method": "universal_fallback",
+            "in_stock": self._extract_stock_from_html(soup),
+
+        }
 
     def _extract_name_universal_fallback(self, soup: BeautifulSoup) -> str:
         """Extract product name using the most universal methods"""
@@ -1017,15 +1235,12 @@ class SimpleProductScraper:
 
     def _try_selectors(self, soup: BeautifulSoup, selectors: List[str]) -> str:
         """Try a list of selectors and return first meaningful result"""
-        for selector in selectors:
-            try:
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(strip=True)
-                    if text and len(text) > 2:
-                        return text
-            except:
-                continue
+        for selector in _compile_selectors(tuple(selectors)):
+            element = selector.select_one(soup)
+            if element:
+                text = element.get_text(strip=True)
+                if text and len(text) > 2:
+                    return text
         return ""
 
     def _extract_likely_product_heading(self, soup: BeautifulSoup) -> str:
@@ -1041,7 +1256,7 @@ class SimpleProductScraper:
                 combined_classes = (parent_classes + ' ' + heading_classes).lower()
                 
                 # If heading has product-related classes or is an h1, it's likely the product name
-                if any(keyword in combined_classes for keyword in ['product', 'item', 'title', 'name']) or heading.name == 'h1':
+                if _PRODUCT_HEADING_CLASS_RE.search(combined_classes) or heading.name == 'h1':
                     return text
         
         return ""
@@ -1124,16 +1339,12 @@ class SimpleProductScraper:
 
     def _try_price_selectors(self, soup: BeautifulSoup, selectors: List[str]) -> float:
         """Try price selectors and return first valid price"""
-        for selector in selectors:
-            try:
-                elements = soup.select(selector)
-                for element in elements:
-                    price_text = element.get_text(strip=True)
-                    price = self._parse_price_universal(price_text)
-                    if price > 0:
-                        return price
-            except:
-                continue
+        for selector in _compile_selectors(tuple(selectors)):
+            for element in selector.select(soup):
+                price_text = element.get_text(strip=True)
+                price = self._parse_price_universal(price_text)
+                if price > 0:
+                    return price
         return 0.0
 
     def _find_price_in_text(self, soup: BeautifulSoup) -> float:
@@ -1142,18 +1353,8 @@ class SimpleProductScraper:
         text = soup.get_text()
         
         # Currency patterns (₹, $, €, £, etc.)
-        currency_patterns = [
-            r'₹\s*(\d+(?:[,.]?\d+)*)',  # Indian Rupee
-            r'\$\s*(\d+(?:[,.]?\d+)*)',  # Dollar
-            r'€\s*(\d+(?:[,.]?\d+)*)',   # Euro
-            r'£\s*(\d+(?:[,.]?\d+)*)',   # Pound
-            r'(\d+(?:[,.]?\d+)*)\s*(?:rs|rupees|dollars|euros|pounds)',  # Word-based
-            r'price[:\s]*(\d+(?:[,.]?\d+)*)',  # Price: 123
-            r'cost[:\s]*(\d+(?:[,.]?\d+)*)'    # Cost: 123
-        ]
-        
-        for pattern in currency_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _TEXT_PRICE_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
                 try:
                     price = self._parse_price_universal(match)
@@ -1185,6 +1386,7 @@ class SimpleProductScraper:
     def _extract_images_universal_fallback(self, soup: BeautifulSoup, base_url: str) -> List[str]:
         """Extract images using universal fallback methods"""
         images = []
+        seen = set()  # nested containers revisit the same <img>; keep membership O(1)
         
         # Strategy 1: Look for any img tags in likely product areas
         likely_containers = soup.select('div, section, article, main')
@@ -1195,8 +1397,7 @@ class SimpleProductScraper:
             container_id = container.get('id', '').lower()
             
             # Skip navigation, footer, header areas
-            if any(skip in container_class + container_id for skip in 
-                   ['nav', 'menu', 'footer', 'header', 'sidebar', 'breadcrumb']):
+            if _CHROME_CONTAINER_RE.search(container_class + container_id):
                 continue
             
             # Find images in this container
@@ -1208,9 +1409,10 @@ class SimpleProductScraper:
                 if src:
                     # Process and validate image URL
                     processed_url = self._process_image_url(src, base_url)
-                    if processed_url and processed_url not in images:
+                    if processed_url and processed_url not in seen:
                         # Filter out likely non-product images
                         if not self._is_likely_non_product_image(processed_url, img):
+                            seen.add(processed_url)
                             images.append(processed_url)
         
         # Strategy 2: Look for images with product-related attributes
@@ -1219,7 +1421,8 @@ class SimpleProductScraper:
             src = img.get('src') or img.get('data-src')
             if src:
                 processed_url = self._process_image_url(src, base_url)
-                if processed_url and processed_url not in images:
+                if processed_url and processed_url not in seen:
+                    seen.add(processed_url)
                     images.append(processed_url)
         
         return images[:15]  # Limit to prevent too many images
@@ -1230,14 +1433,8 @@ class SimpleProductScraper:
         alt_text = (img_element.get('alt') or '').lower()
         
         # Skip common non-product images
-        skip_patterns = [
-            'logo', 'banner', 'icon', 'arrow', 'button', 'bg', 'background',
-            'social', 'payment', 'shipping', 'footer', 'header', 'nav'
-        ]
-        
-        for pattern in skip_patterns:
-            if pattern in url_lower or pattern in alt_text:
-                return True
+        if _NON_PRODUCT_IMAGE_RE.search(url_lower) or _NON_PRODUCT_IMAGE_RE.search(alt_text):
+            return True
         
         # Check image dimensions if available
         width = img_element.get('width')
@@ -1309,15 +1506,12 @@ class SimpleProductScraper:
 
     def _try_description_selectors(self, soup: BeautifulSoup, selectors: List[str]) -> str:
         """Try description selectors and return first meaningful result"""
-        for selector in selectors:
-            try:
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(strip=True)
-                    if text and len(text) > 20:
-                        return text
-            except:
-                continue
+        for selector in _compile_selectors(tuple(selectors)):
+            element = selector.select_one(soup)
+            if element:
+                text = element.get_text(strip=True)
+                if text and len(text) > 20:
+                    return text
         return ""
 
     def _extract_description_from_paragraphs(self, soup: BeautifulSoup) -> str:
@@ -1332,8 +1526,7 @@ class SimpleProductScraper:
                 if len(text) > 50 and len(text) < 1000:  # Reasonable description length
                     # Skip if it looks like navigation or boilerplate
                     text_lower = text.lower()
-                    if not any(skip in text_lower for skip in 
-                              ['click here', 'read more', 'terms', 'privacy', 'cookie']):
+                    if not _BOILERPLATE_TEXT_RE.search(text_lower):
                         return text
         
         return ""
@@ -1416,21 +1609,9 @@ class SimpleProductScraper:
         """Enhanced collection URL detection that works for all websites"""
         url_lower = url.lower()
         
-        # Definitive collection patterns
-        collection_patterns = [
-            '/collections/', '/collection/', '/category/', '/categories/',
-            '/product-category/', '/shop/', '/store/', '/browse/',
-            '/all-products/', '/products', '/items/', '/catalog/',
-            '/c/', '/cat/', '/department/', '/section/', '/tags/',
-            '/brand/', '/brands/', '/search', '/filter'
-        ]
-        
-        # Check for collection patterns
-        for pattern in collection_patterns:
-            if pattern in url_lower:
-                # Make sure it's not a single product URL
-                if not any(single in url_lower for single in ['/product/', '/item/', '/p/']):
-                    return True
+        # Definitive collection patterns, unless it's a single product URL
+        if _COLLECTION_PATH_RE.search(url_lower) and not _SINGLE_PRODUCT_PATH_RE.search(url_lower):
+            return True
         
         # Check URL structure - collections often have shorter paths or query parameters
         parsed_url = urlparse(url)
@@ -1438,13 +1619,12 @@ class SimpleProductScraper:
         path_segments = [seg for seg in path.split('/') if seg]
         
         # If URL has only 1-2 path segments after domain, likely a collection
-        if len(path_segments) <= 2 and any(keyword in url_lower for keyword in 
-                                          ['shop', 'store', 'product', 'item', 'collection']):
+        if len(path_segments) <= 2 and _LISTING_KEYWORD_RE.search(url_lower):
             return True
         
         # Check for query parameters that suggest collections
         query_params = parsed_url.query.lower()
-        if any(param in query_params for param in ['category', 'collection', 'type', 'filter', 'tag', 'brand']):
+        if _LISTING_QUERY_RE.search(query_params):
             return True
         
         return False
@@ -1469,28 +1649,18 @@ class SimpleProductScraper:
 
                 self.log(f"Fetching collection page: {page_url}")
 
-                async with httpx.AsyncClient(timeout=15) as client:
-                    response = await client.get(page_url, headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-                    })
+                response = await self._http_get(page_url, timeout=15, headers={
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+                })
 
                 if response.status_code != 200:
                     self.log(f"Page {page} returned status {response.status_code}, stopping pagination", "WARNING")
                     break
 
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                # Extract product links using universal selectors
-                for selector in self.universal_scraper.universal_selectors['product_links']:
-                    for a in soup.select(selector):
-                        href = a.get("href")
-                        if href:
-                            # Normalize link
-                            if href.startswith("/"):
-                                href = urljoin(url, href)
-                            if href.startswith("http") and href not in seen:
-                                seen.add(href)
-                                product_links.append(href)
+                for href in await self._parse_html("_parse_collection_page_links", response.text, url):
+                    if href not in seen:
+                        seen.add(href)
+                        product_links.append(href)
 
                 # Stop if no new links were found on this page
                 if len(product_links) == len(seen):
@@ -1502,45 +1672,75 @@ class SimpleProductScraper:
 
         return product_links
     
+    def _parse_collection_page_links(self, html: str, base_url: str) -> List[str]:
+        """Absolute links matched by the universal product-link selectors, in page order"""
+        tree = HTMLParser(html)
+        links = []
+        for selector in self.universal_scraper.universal_selectors['product_links']:
+            for a in tree.css(selector):
+                href = a.attributes.get("href")
+                if href:
+                    # Normalize link
+                    if href.startswith("/"):
+                        href = urljoin(base_url, href)
+                    if href.startswith("http"):
+                        links.append(href)
+        return links
+
+    def _parse_product_links_universal(self, html: str, base_url: str) -> List[str]:
+        """Parse a collection page and run the enhanced universal link extraction on it"""
+        return self._extract_product_links_universal(HTMLParser(html), base_url)
+
     async def _extract_links_http(self, collection_url: str) -> List[str]:
         """Extract product links using HTTP requests"""
         try:
-            async with httpx.AsyncClient(timeout=15) as client:
-                response = await client.get(collection_url, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    return self._extract_product_links_universal(soup, collection_url)
+            response = await self._http_get(collection_url, timeout=15, headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+            
+            if response.status_code == 200:
+                return await self._parse_html("_parse_product_links_universal", response.text, collection_url)
         except Exception as e:
             self.log(f"HTTP link extraction failed: {e}", "DEBUG")
         return []
 
+    async def _render_page_html(self, url: str) -> str:
+        """
+        Load a page in the browser and return its rendered HTML.
+        
+        The browser page is released before returning, so callers never hold
+        a pool slot while scraping (which may need further pages) runs.
+        """
+        async with self._browser_page() as page:
+            await page.goto(url, wait_until="domcontentloaded", timeout=25000)
+            try:
+                await page.wait_for_load_state("networkidle", timeout=5000)
+            except:
+                pass
+            return await page.content()
+
     async def _extract_links_browser(self, collection_url: str) -> List[str]:
         """Extract product links using browser"""
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                
-                await page.goto(collection_url, wait_until="domcontentloaded", timeout=25000)
-                try:
-                    await page.wait_for_load_state("networkidle", timeout=5000)
-                except:
-                    pass
-                content = await page.content()
-                await browser.close()
-                
-                soup = BeautifulSoup(content, 'html.parser')
-                return self._extract_product_links_universal(soup, collection_url)
+            content = await self._render_page_html(collection_url)
+            return await self._parse_html("_parse_product_links_universal", content, collection_url)
         except Exception as e:
             self.log(f"Browser link extraction failed: {e}", "DEBUG")
         return []
 
-    def _extract_product_links_universal(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Enhanced universal product link extraction"""
+    def _extract_product_links_universal(self, tree: Union[HTMLParser, BeautifulSoup], base_url: str) -> List[str]:
+        """
+        Enhanced universal product link extraction
+        
+        Takes a selectolax tree (fast path) or, for callers that already
+        hold one, a BeautifulSoup object.
+        """
         links = []
+        seen = set()
+        if isinstance(tree, BeautifulSoup):
+            select, get_href = tree.select, lambda element: element.get('href')
+        else:
+            select, get_href = tree.css, lambda element: element.attributes.get('href')
         
         # Enhanced selectors for all e-commerce platforms
         selectors = [
@@ -1566,9 +1766,9 @@ class SimpleProductScraper:
         
         for selector in selectors:
             try:
-                elements = soup.select(selector)
+                elements = select(selector)
                 for element in elements:
-                    href = element.get('href')
+                    href = get_href(element)
                     if href:
                         # Convert relative URLs to absolute
                         if href.startswith('/'):
@@ -1577,7 +1777,8 @@ class SimpleProductScraper:
                             href = urljoin(base_url, '/') + href.lstrip('/')
                         
                         # Filter valid product URLs
-                        if self._is_valid_product_url(href, base_url) and href not in links:
+                        if href not in seen and self._is_valid_product_url(href, base_url):
+                            seen.add(href)
                             links.append(href)
                             
                         if len(links) >= 100:  # Reasonable limit
@@ -1589,47 +1790,11 @@ class SimpleProductScraper:
             if len(links) >= 100:
                 break
         
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_links = []
-        for link in links:
-            if link not in seen:
-                seen.add(link)
-                unique_links.append(link)
-        
-        return unique_links
+        return links
 
     def _is_valid_product_url(self, href: str, base_url: str) -> bool:
         """Check if URL is a valid product URL"""
-        if not href or not href.startswith('http'):
-            return False
-        
-        href_lower = href.lower()
-        base_domain = urlparse(base_url).netloc.lower()
-        url_domain = urlparse(href).netloc.lower()
-        
-        # Must be from same domain
-        if base_domain not in url_domain and url_domain not in base_domain:
-            return False
-        
-        # Should contain product indicators
-        product_indicators = ['/product/', '/products/', '/item/', '/p/']
-        has_product_indicator = any(indicator in href_lower for indicator in product_indicators)
-        
-        # Should NOT contain exclusion patterns
-        exclusion_patterns = [
-            '/cart', '/checkout', '/account', '/login', '/register', 
-            '/search', '/contact', '/about', '/policy', '/terms',
-            '/collections/', '/category/', '/shop', '.js', '.css',
-            '.jpg', '.png', '.gif', '.pdf', 'javascript:', 'mailto:'
-        ]
-        has_exclusion = any(pattern in href_lower for pattern in exclusion_patterns)
-        
-        # URL should be reasonable length
-        if len(href) > 500:
-            return False
-        
-        return has_product_indicator and not has_exclusion
+        return _is_product_url(href, base_url)
 
     # ENHANCED COLLECTION SCRAPING WITH PAGINATION
 
@@ -1639,70 +1804,57 @@ class SimpleProductScraper:
         current_url = url
         page_num = 1
 
-        # Move browser creation OUTSIDE the loop
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-
+        while current_url and page_num <= max_pages:
+            self.log(f"Scraping page {page_num}: {current_url}")
+            
+            if progress_callback:
+                await progress_callback({
+                    "stage": "scraping",
+                    "percentage": 10 + (page_num * 70 // max_pages),
+                    "details": f"Scraping page {page_num} of {max_pages}"
+                })
+            
             try:
-                while current_url and page_num <= max_pages:
-                    self.log(f"Scraping page {page_num}: {current_url}")
-                    
-                    if progress_callback:
-                        await progress_callback({
-                            "stage": "scraping",
-                            "percentage": 10 + (page_num * 70 // max_pages),
-                            "details": f"Scraping page {page_num} of {max_pages}"
-                        })
-                    
-                    try:
-                        await page.goto(current_url, wait_until="domcontentloaded", timeout=25000)
-                        try:
-                            await page.wait_for_load_state("networkidle", timeout=5000)
-                        except:
-                            pass
-                        content = await page.content()
-                        soup = BeautifulSoup(content, "html.parser")
-
-                        # Extract product links
-                        product_links = self._extract_product_links_universal(soup, current_url)
-                        self.log(f"Found {len(product_links)} product links on page {page_num}")
-
-                        if not product_links:
-                            self.log("No product links found, stopping.", "WARNING")
-                            break
+                # Only hold a browser page while rendering: the product scrape below
+                # takes its own pages from the same pool
+                content = await self._render_page_html(current_url)
+                soup = await asyncio.to_thread(self._parse, content)
 
-                        # Scrape products using the hybrid method (NOT passing the browser)
-                        products = await self.scrape_all_products_hybrid(product_links)
-                        
-                        # ADD INDIVIDUAL PRODUCT URL AS SOURCE URL FOR EACH PRODUCT
-                        for product, product_url in zip(products, product_links):
-                            if product and self._is_valid_product_data(product):
-                                product["source_url"] = product_url  # Individual product page URL
-                                all_products.append(product)
-
-                        # Enhanced pagination detection
-                        next_page_url = self._find_next_page_url_universal(soup, current_url, page_num)
-                        if next_page_url and next_page_url != current_url:
-                            current_url = next_page_url
-                            page_num += 1
-                        else:
-                            self.log("No more pages found", "INFO")
-                            break
-                            
-                    except Exception as e:
-                        self.log(f"Error scraping page {page_num}: {e}", "ERROR")
-                        # Don't break immediately, try to continue to next page
-                        if page_num < max_pages:
-                            page_num += 1
-                            continue
-                        else:
-                            break
+                # Extract product links
+                product_links = self._extract_product_links_universal(soup, current_url)
+                self.log(f"Found {len(product_links)} product links on page {page_num}")
 
-            finally:
-                # Close browser ONLY after all pages are processed
-                await browser.close()
+                if not product_links:
+                    self.log("No product links found, stopping.", "WARNING")
+                    break
+
+                # Scrape products using the hybrid method (NOT passing the browser)
+                products = await self.scrape_all_products_hybrid(product_links)
                 
+                # ADD INDIVIDUAL PRODUCT URL AS SOURCE URL FOR EACH PRODUCT
+                for product, product_url in zip(products, product_links):
+                    if product and self._is_valid_product_data(product):
+                        product["source_url"] = product_url  # Individual product page URL
+                        all_products.append(product)
+
+                # Enhanced pagination detection
+                next_page_url = self._find_next_page_url_universal(soup, current_url, page_num)
+                if next_page_url and next_page_url != current_url:
+                    current_url = next_page_url
+                    page_num += 1
+                else:
+                    self.log("No more pages found", "INFO")
+                    break
+                    
+            except Exception as e:
+                self.log(f"Error scraping page {page_num}: {e}", "ERROR")
+                # Don't break immediately, try to continue to next page
+                if page_num < max_pages:
+                    page_num += 1
+                    continue
+                else:
+                    break
+
         return all_products
 
     def _find_next_page_url_universal(self, soup: BeautifulSoup, current_url: str, current_page: int) -> Optional[str]:
@@ -1757,22 +1909,19 @@ class SimpleProductScraper:
                 return current_url.replace(f"page={current_page}", f"page={next_page}")
             elif "page=" in current_url:
                 # Replace existing page parameter
-                import re
-                return re.sub(r'page=\d+', f'page={next_page}', current_url)
+                return _PAGE_PARAM_RE.sub(f'page={next_page}', current_url)
             
             # Pattern 2: /page/N
             if f"/page/{current_page}" in current_url:
                 return current_url.replace(f"/page/{current_page}", f"/page/{next_page}")
             elif "/page/" in current_url:
-                import re
-                return re.sub(r'/page/\d+', f'/page/{next_page}', current_url)
+                return _PAGE_PATH_RE.sub(f'/page/{next_page}', current_url)
             
             # Pattern 3: ?p=N
             if f"p={current_page}" in current_url:
                 return current_url.replace(f"p={current_page}", f"p={next_page}")
             elif "p=" in current_url:
-                import re
-                return re.sub(r'p=\d+', f'p={next_page}', current_url)
+                return _P_PARAM_RE.sub(f'p={next_page}', current_url)
             
             # Pattern 4: Add page parameter if none exists
             if current_page == 1:
@@ -1813,55 +1962,136 @@ class SimpleProductScraper:
 # Keep all your existing extract_product_data and other methods...
 # [Rest of the original methods remain unchanged]
 
+# Per-process parser instance used by _parse_in_worker (created lazily in each pool worker)
+_worker_scraper: Optional[SimpleProductScraper] = None
+
+def _parse_in_worker(method_name: str, *args):
+    """Process-pool entry point: run one of SimpleProductScraper's HTML parsers by name"""
+    global _worker_scraper
+    if _worker_scraper is None:
+        _worker_scraper = SimpleProductScraper()
+    return getattr(_worker_scraper, method_name)(*args)
+
 # Enhanced API function
+def build_scrape_metadata(timestamp: str, products_count: int, total_pages_scraped: int,
+                          urls_processed: int, unique_urls: int) -> Dict[str, Any]:
+    """Metadata block written alongside the products of an enhanced-universal scrape"""
+    return {
+        "timestamp": timestamp,
+        "total_products": products_count,
+        "total_pages_scraped": total_pages_scraped,
+        "scraper_type": "enhanced-universal",
+        "urls_processed": urls_processed,
+        "unique_urls": unique_urls,
+        "success_rate": round((products_count / max(total_pages_scraped, 1)) * 100, 2)
+    }
+
+async def _iter_url_results(scraper: SimpleProductScraper, urls: List[str],
+                            max_pages: int) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Scrape the URLs one at a time, yielding each URL's products as soon as it is done
+    
+    Each chunk is {"url", "products", "pages_scraped", "new_urls"}; product
+    links already seen for an earlier URL are skipped.
+    """
+    seen_urls = set()
+
+    for i, url in enumerate(urls):
+        scraper.update_progress("analyzing_urls", 10 + (i * 5), f"Processing URL {i+1}/{len(urls)}")
+        products = []
+        pages_scraped = 0
+        seen_before = len(seen_urls)
+
+        if scraper.is_collection_url(url):
+            scraper.log(f"Detected collection page: {url}")
+
+            # Extract all product links across pages
+            product_links = await scraper.extract_collection_links(url, max_pages=max_pages)
+
+            scraper.log(f"Found {len(product_links)} product links in collection {url}")
+
+            new_links = []
+            for link in product_links:
+                if link not in seen_urls:
+                    seen_urls.add(link)
+                    new_links.append(link)
+
+            # Product pages are independent network fetches: overlap them (bounded by the
+            # scraper's semaphore) instead of awaiting one link at a time
+            products = await scraper.scrape_all_products_hybrid(new_links)
+            pages_scraped = len(products)
+
+        else:
+            # Direct product page
+            if url not in seen_urls:
+                seen_urls.add(url)
+                scraper.update_progress("scraping_products", 50, f"Scraping product {url}")
+                data = await scraper.extract_product_data_hybrid(url)
+                if data and scraper._is_valid_product_data(data):
+                    products.append(data)
+                    pages_scraped += 1
+
+        yield {
+            "url": url,
+            "products": products,
+            "pages_scraped": pages_scraped,
+            "new_urls": len(seen_urls) - seen_before
+        }
+
+async def scrape_urls_simple_stream(
+    urls: List[str],
+    log_callback: Optional[Callable] = None,
+    progress_callback: Optional[Callable] = None,
+    max_pages: int = 20,
+    http_client: Optional[httpx.AsyncClient] = None,
+    parse_pool: Optional[concurrent.futures.Executor] = None,
+    browser: Optional[SharedBrowser] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of scrape_urls_simple_api: yields one chunk per input URL
+    
+    Nothing is accumulated or saved, so callers can write products out as
+    they arrive (see build_scrape_metadata for the summary block).
+    """
+    scraper = SimpleProductScraper(log_callback, progress_callback, http_client=http_client,
+                                   parse_pool=parse_pool, browser=browser)
+    scraper.log("Starting enhanced universal scraping process (streaming)")
+
+    try:
+        async for chunk in _iter_url_results(scraper, urls, max_pages):
+            yield chunk
+    finally:
+        await scraper.aclose()
+
+    scraper.log("Enhanced universal scraping completed successfully", "SUCCESS")
+
 async def scrape_urls_simple_api(
     urls: List[str],
     log_callback: Optional[Callable] = None,
     progress_callback: Optional[Callable] = None,
-    max_pages: int = 20
+    max_pages: int = 20,
+    http_client: Optional[httpx.AsyncClient] = None,
+    parse_pool: Optional[concurrent.futures.Executor] = None,
+    browser: Optional[SharedBrowser] = None
 ) -> Dict[str, Any]:
     """
     Enhanced Simple API function to scrape ALL product data from ANY e-commerce website
     """
-    scraper = SimpleProductScraper(log_callback, progress_callback)
+    scraper = SimpleProductScraper(log_callback, progress_callback, http_client=http_client,
+                                   parse_pool=parse_pool, browser=browser)
 
     try:
         scraper.log("Starting enhanced universal scraping process")
         scraper.update_progress("initialization", 5, "Setting up universal scraper")
 
         all_products = []
-        seen_urls = set()
+        unique_urls = 0
         total_pages_scraped = 0
 
-        for i, url in enumerate(urls):
-            scraper.update_progress("analyzing_urls", 10 + (i * 5), f"Processing URL {i+1}/{len(urls)}")
-
-            if scraper.is_collection_url(url):
-                scraper.log(f"Detected collection page: {url}")
-
-                # Extract all product links across pages
-                product_links = await scraper.extract_collection_links(url, max_pages=max_pages)
-
-                scraper.log(f"Found {len(product_links)} product links in collection {url}")
-
-                for link in product_links:
-                    if link not in seen_urls:
-                        seen_urls.add(link)
-                        data = await scraper.extract_product_data_hybrid(link)
-                        if data and scraper._is_valid_product_data(data):
-                            data["source_url"] = link 
-                            all_products.append(data)
-                            total_pages_scraped += 1
-
-            else:
-                # Direct product page
-                if url not in seen_urls:
-                    seen_urls.add(url)
-                    scraper.update_progress("scraping_products", 50, f"Scraping product {url}")
-                    data = await scraper.extract_product_data_hybrid(url)
-                    if data and scraper._is_valid_product_data(data):
-                        all_products.append(data)
-                        total_pages_scraped += 1
+        async for chunk in _iter_url_results(scraper, urls, max_pages):
+            all_products.extend(chunk["products"])
+            total_pages_scraped += chunk["pages_scraped"]
+            unique_urls += chunk["new_urls"]
 
         scraper.update_progress("completed", 100, f"Completed! Found {len(all_products)} unique products")
         scraper.log("Enhanced universal scraping completed successfully", "SUCCESS")
@@ -1869,15 +2099,9 @@ async def scrape_urls_simple_api(
         # Final result with metadata
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         result = {
-            "metadata": {
-                "timestamp": timestamp,
-                "total_products": len(all_products),
-                "total_pages_scraped": total_pages_scraped,
-                "scraper_type": "enhanced-universal",
-                "urls_processed": len(urls),
-                "unique_urls": len(seen_urls),
-                "success_rate": round((len(all_products) / max(total_pages_scraped, 1)) * 100, 2)
-            },
+            "metadata": build_scrape_metadata(
+                timestamp, len(all_products), total_pages_scraped, len(urls), unique_urls
+            ),
             "products": all_products
         }
 
@@ -1895,6 +2119,8 @@ async def scrape_urls_simple_api(
         scraper.log(f"Error in enhanced universal scraping: {e}", "ERROR")
         scraper.log(f"Traceback: {traceback.format_exc()}", "ERROR")
         raise e
+    finally:
+        await scraper.aclose()
 if __name__ == "__main__":
     # Test the enhanced scraper
     async def test_enhanced_scraper():
@@ -231,6 +231,8 @@ start_server() {
         exec uvicorn api:app \
             --host "${HOST}" \
             --port "${PORT}" \
+            --loop uvloop \
+            --http httptools \
             --log-level "${LOG_LEVEL}" \
             ${RELOAD} \
             ${ACCESS_LOG}
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test that stripping script/style/svg blocks before parsing keeps product markup
+"""
+
+from scraper_simple_deep import SimpleProductScraper
+
+PRODUCT_MARKUP = (
+    '<h1 class="product-title">Linen Shirt</h1>'
+    '<span class="price">₹ 1,299</span>'
+    '<a href="/products/linen-shirt">Linen Shirt</a>'
+)
+
+def _parse(html):
+    scraper = SimpleProductScraper()
+    scraper.log = lambda *args, **kwargs: None
+    return scraper, scraper._parse(html)
+
+def test_self_closing_svg_keeps_following_markup():
+    """A self-closing <svg/> must not swallow everything up to a later </svg>"""
+    html = (
+        '<html><body><svg class="icon" viewBox="0 0 1 1"/>'
+        + PRODUCT_MARKUP
+        + '<footer><svg><path d="M0 0"/></svg></footer></body></html>'
+    )
+    scraper, soup = _parse(html)
+
+    assert soup.select_one('h1.product-title').get_text(strip=True) == 'Linen Shirt'
+    assert scraper._extract_price_universal_fallback(soup) == 1299.0
+    assert soup.select_one('a[href="/products/linen-shirt"]') is not None
+    # The paired <svg>...</svg> icon is still cut out
+    assert soup.find('path') is None
+
+def test_script_and_style_blocks_are_stripped():
+    """Script/style bodies are removed, including the self-closing-looking <script/>"""
+    html = (
+        '<html><head><style>.price{color:red}</style></head><body>'
+        '<script src="a.js"/><script>var price = "₹ 9";</script>'
+        + PRODUCT_MARKUP
+        + '</body></html>'
+    )
+    _, soup = _parse(html)
+
+    assert soup.find('script') is None and soup.find('style') is None
+    assert soup.select_one('h1.product-title').get_text(strip=True) == 'Linen Shirt'
+
+if __name__ == "__main__":
+    test_self_closing_svg_keeps_following_markup()
+    test_script_and_style_blocks_are_stripped()
+    print("✅ Unqueried-block stripping tests passed")
@@ -27,3 +27,5 @@ async def run_simple_scrape_task(task_id: str, urls: List[str], max_pages: int =
         active_tasks[task_id]["status"] = "failed"
         active_tasks[task_id]["error"] = str(e)
         active_tasks[task_id]["end_time"] = datetime.now().isoformat()
+    finally:
+        await scraper.aclose()
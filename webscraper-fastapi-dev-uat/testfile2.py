@@ -23,17 +23,16 @@ async def run_simple_scrape_task(task_id: str, urls: List[str], max_pages: int):
         #     progress_callback=progress_callback
         # )
         all_results = []
-        scraper = SimpleProductScraper()
-
-        for url in urls:
-            if "/collection" in url or "/category" in url:
-                products = await scraper.scrape_collection_with_pagination(
-                    url, max_pages=max_pages
-                )
-                all_results.extend(products)
-            else:
-                product = await scraper.extract_product_data(url)
-                all_results.append(product)
+        async with SimpleProductScraper() as scraper:
+            for url in urls:
+                if "/collection" in url or "/category" in url:
+                    products = await scraper.scrape_collection_with_pagination(
+                        url, max_pages=max_pages
+                    )
+                    all_results.extend(products)
+                else:
+                    product = await scraper.extract_product_data(url)
+                    all_results.append(product)
 
         # Wrap in same structure scrape_urls_simple_api returned
         result = {"products": all_results, "metadata": {"timestamp": datetime.now().isoformat()}}